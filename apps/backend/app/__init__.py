@@ -1,8 +1,11 @@
 from flask import Flask
 
+from app.api.browser_state_routes import browser_state_bp
+from app.api.metrics_routes import metrics_bp
+from app.api.monitor_routes import monitor_bp
 from app.api.task_routes import task_bp
 from app.core.config import Settings
-from app.db.session import init_db
+from app.db.session import close_request_session, init_db
 
 
 def create_app() -> Flask:
@@ -11,15 +14,32 @@ def create_app() -> Flask:
     app = Flask(__name__)
     app.config["SETTINGS"] = settings
 
-    init_db(settings.database_url)
+    init_db(
+        settings.database_url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout_s=settings.db_pool_timeout_s,
+        pool_recycle_s=settings.db_pool_recycle_s,
+        cooperative=settings.server_mode == "gevent",
+    )
+    app.teardown_appcontext(close_request_session)
 
     app.register_blueprint(task_bp, url_prefix="/tasks")
+    app.register_blueprint(browser_state_bp, url_prefix="/browser-state")
+    app.register_blueprint(metrics_bp, url_prefix="/metrics")
+    app.register_blueprint(monitor_bp, url_prefix="/monitors")
+
+    if settings.monitor_scheduler_enabled:
+        from app.services.monitor_scheduler import start_monitor_scheduler
+
+        start_monitor_scheduler(settings)
 
     @app.after_request
     def add_cors_headers(response):  # type: ignore[override]
         response.headers["Access-Control-Allow-Origin"] = "*"
         response.headers["Access-Control-Allow-Headers"] = "Authorization, Content-Type"
         response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
+        response.headers["Access-Control-Expose-Headers"] = "Retry-After, X-Deduplicated-Task"
         return response
 
     return app
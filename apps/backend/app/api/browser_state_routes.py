@@ -0,0 +1,36 @@
+from flask import Blueprint, g
+
+from app.auth.clerk_middleware import clerk_required
+from app.db.session import get_request_session
+from app.schemas.browser_state import BrowserStateRead
+from app.services.browser_storage_service import BrowserStorageService
+
+browser_state_bp = Blueprint("browser_state", __name__)
+
+
+@browser_state_bp.get("")
+@clerk_required
+def list_browser_states():
+    session = get_request_session()
+    service = BrowserStorageService(session)
+    states = service.list_states(g.current_user.id)
+    return [BrowserStateRead.model_validate(state).model_dump() for state in states]
+
+
+@browser_state_bp.delete("")
+@clerk_required
+def purge_browser_states():
+    session = get_request_session()
+    service = BrowserStorageService(session)
+    return {"deleted": service.purge(g.current_user.id)}
+
+
+@browser_state_bp.delete("/<path:domain>")
+@clerk_required
+def purge_browser_state(domain: str):
+    session = get_request_session()
+    service = BrowserStorageService(session)
+    deleted = service.purge(g.current_user.id, domain.lower().removeprefix("www."))
+    if not deleted:
+        return {"error": "Browser state not found"}, 404
+    return {"deleted": deleted}
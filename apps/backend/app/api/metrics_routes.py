@@ -0,0 +1,16 @@
+from flask import Blueprint
+
+from app.llm.routing import get_model_router
+from app.orchestration.runtime.admission import get_admission_controller
+from app.orchestration.runtime.event_bus import get_event_bus
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.get("")
+def get_metrics():
+    return {
+        "admission": get_admission_controller().metrics(),
+        "streams": get_event_bus().stats(),
+        "llm": get_model_router().stats.snapshot(),
+    }
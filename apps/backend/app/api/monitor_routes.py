@@ -0,0 +1,101 @@
+from flask import Blueprint, g, request
+
+from app.auth.clerk_middleware import clerk_required
+from app.core.concurrency import offload
+from app.core.config import Settings
+from app.db.session import get_request_session
+from app.schemas.monitor import MonitorCreate, MonitorRead, MonitorUpdate
+from app.services.monitor_scheduler import run_monitor_with_admission
+from app.services.monitor_service import MonitorService
+
+monitor_bp = Blueprint("monitors", __name__)
+
+
+def _interval_error(interval_minutes: int | None, settings: Settings):
+    if interval_minutes is not None and interval_minutes < settings.monitor_min_interval_minutes:
+        return {
+            "error": f"interval_minutes must be at least {settings.monitor_min_interval_minutes}"
+        }, 400
+    return None
+
+
+@monitor_bp.get("")
+@clerk_required
+def list_monitors():
+    service = MonitorService(get_request_session())
+    monitors = service.list_monitors(g.current_user.id)
+    return [MonitorRead.model_validate(monitor).model_dump() for monitor in monitors]
+
+
+@monitor_bp.post("")
+@clerk_required
+def create_monitor():
+    payload = MonitorCreate(**request.get_json(force=True))
+    settings = Settings()
+    error = _interval_error(payload.interval_minutes, settings)
+    if error:
+        return error
+    service = MonitorService(get_request_session(), settings)
+    monitor = service.create_monitor(
+        g.current_user.id, payload.prompt, payload.interval_minutes, payload.notify_url
+    )
+    return MonitorRead.model_validate(monitor).model_dump(), 201
+
+
+@monitor_bp.get("/<int:monitor_id>")
+@clerk_required
+def get_monitor(monitor_id: int):
+    service = MonitorService(get_request_session())
+    monitor = service.get_monitor(monitor_id, g.current_user.id)
+    if not monitor:
+        return {"error": "Monitor not found"}, 404
+    return MonitorRead.model_validate(monitor).model_dump()
+
+
+@monitor_bp.patch("/<int:monitor_id>")
+@clerk_required
+def update_monitor(monitor_id: int):
+    payload = MonitorUpdate(**request.get_json(force=True))
+    settings = Settings()
+    error = _interval_error(payload.interval_minutes, settings)
+    if error:
+        return error
+    service = MonitorService(get_request_session(), settings)
+    monitor = service.get_monitor(monitor_id, g.current_user.id)
+    if not monitor:
+        return {"error": "Monitor not found"}, 404
+    monitor = service.update_monitor(monitor, payload)
+    return MonitorRead.model_validate(monitor).model_dump()
+
+
+@monitor_bp.delete("/<int:monitor_id>")
+@clerk_required
+def delete_monitor(monitor_id: int):
+    service = MonitorService(get_request_session())
+    monitor = service.get_monitor(monitor_id, g.current_user.id)
+    if not monitor:
+        return {"error": "Monitor not found"}, 404
+    service.delete_monitor(monitor)
+    return {"deleted": monitor_id}
+
+
+@monitor_bp.post("/<int:monitor_id>/run")
+@clerk_required
+def run_monitor(monitor_id: int):
+    """Run a check now, outside the schedule."""
+    session = get_request_session()
+    service = MonitorService(session)
+    if not service.get_monitor(monitor_id, g.current_user.id):
+        return {"error": "Monitor not found"}, 404
+    # The check uses its own session; do not hold this one's connection meanwhile.
+    session.close()
+    outcome = offload(
+        run_monitor_with_admission, monitor_id, g.current_user.id, Settings(), reschedule=False
+    )
+    if outcome["status"] == "deferred":
+        retry_after = str(outcome["retry_after"])
+        return {"error": "Too many tasks", **outcome}, 429, {"Retry-After": retry_after}
+    monitor = service.get_monitor(monitor_id, g.current_user.id)
+    if not monitor:
+        return {"error": "Monitor not found"}, 404
+    return {"outcome": outcome, "monitor": MonitorRead.model_validate(monitor).model_dump()}
@@ -0,0 +1,38 @@
+import json
+from collections.abc import Iterable
+
+from flask import Response
+
+from app.orchestration.runtime.event_bus import Subscription, get_event_bus
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+def sse_response(events: Iterable[dict]) -> Response:
+    return Response(
+        (format_sse(event) for event in events),
+        mimetype="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+def subscription_response(subscription: Subscription, heartbeat_s: float) -> Response:
+    """Stream a task's events until it finishes, with comment heartbeats while idle.
+
+    The generator holds no request context or DB session, so an open stream costs one
+    greenlet (or thread) plus the subscription's bounded buffer.
+    """
+    bus = get_event_bus()
+
+    def generate():
+        try:
+            for event in subscription.iter_events(heartbeat_s):
+                yield ": keep-alive\n\n" if event is None else format_sse(event)
+        finally:
+            bus.unsubscribe(subscription)
+
+    return Response(generate(), mimetype="text/event-stream", headers=SSE_HEADERS)
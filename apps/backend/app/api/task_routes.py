@@ -1,89 +1,262 @@
-from flask import Blueprint, g, request
+from flask import Blueprint, g, request, send_from_directory
 
+from app.api.sse import sse_response, subscription_response
 from app.auth.clerk_middleware import clerk_required
-from app.db.session import get_session
-import json
-
-from flask import Response, stream_with_context
-
-from app.orchestration.browser_graph import run_browser_graph, run_browser_graph_stream
+from app.core.concurrency import offload
+from app.core.config import Settings
+from app.db.session import get_request_session
+from app.models.task import Task
+from app.orchestration.runtime.admission import AdmissionRejected, get_admission_controller
+from app.orchestration.runtime.artifacts import (
+    list_task_artifacts,
+    should_capture_debug,
+    task_artifact_dir,
+)
+from app.orchestration.runtime.event_bus import get_event_bus
 from app.orchestration.runtime.session_store import ACTIVE_SESSIONS
-from app.schemas.task import TaskCreate, TaskRead
+from app.schemas.task import TaskCreate, TaskRead, TaskSearchPage, TaskSearchResult
+from app.services.task_dedupe import find_duplicate_task, prompt_fingerprint, single_flight
+from app.services.task_runner import QUEUE_TIMEOUT_ERROR, start_stream_task
 from app.services.task_service import TaskService
 
 task_bp = Blueprint("tasks", __name__)
 
+SEARCH_MAX_PAGE_SIZE = 50
+# Set when a submission was answered by an existing identical task.
+DEDUPLICATED_HEADER = "X-Deduplicated-Task"
+
+
+def _task_event_response(service: TaskService, task: Task, settings: Settings):
+    subscription = get_event_bus().subscribe(task.id)
+    if subscription is not None:
+        return subscription_response(subscription, settings.sse_heartbeat_s)
+    # The task may have finished since it was loaded.
+    service.session.refresh(task)
+    events = [{"event": "task", "data": {"task_id": task.id}}]
+    if task.status == "completed":
+        events.append({"event": "complete", "data": task.result or {}})
+    elif task.status == "failed":
+        events.append({"event": "error", "data": {"error": task.error}})
+    return sse_response(events)
+
+
+def _await_duplicate(service: TaskService, task: Task, user_id: int, settings: Settings):
+    """Answer a duplicate /run with the original task's outcome, waiting if it is live."""
+    subscription = get_event_bus().subscribe(task.id)
+    if subscription is not None:
+        # Do not hold a pooled connection while the original task runs.
+        service.session.close()
+        try:
+            for _event in subscription.iter_events(settings.sse_heartbeat_s):
+                pass
+        finally:
+            get_event_bus().unsubscribe(subscription)
+    task = service.get_task(task.id, user_id)
+    status = {"completed": 200, "failed": 400}.get(task.status, 202)
+    return TaskRead.model_validate(task).model_dump(), status, {DEDUPLICATED_HEADER: str(task.id)}
+
+
+def _rejected_response(exc: AdmissionRejected):
+    return (
+        {"error": "Too many tasks", "reason": exc.reason, "retry_after": exc.retry_after},
+        429,
+        {"Retry-After": str(exc.retry_after)},
+    )
+
 
 @task_bp.get("")
 @clerk_required
 def list_tasks():
-    session = next(get_session())
-    try:
-        service = TaskService(session)
-        tasks = service.list_tasks(g.current_user.id)
-        return [TaskRead.model_validate(task).model_dump() for task in tasks]
-    finally:
-        session.close()
+    session = get_request_session()
+    service = TaskService(session)
+    tasks = service.list_tasks(g.current_user.id)
+    return [TaskRead.model_validate(task).model_dump() for task in tasks]
+
+
+@task_bp.get("/search")
+@clerk_required
+def search_tasks():
+    query = request.args.get("q", "").strip()
+    if not query:
+        return {"error": "Query parameter q is required"}, 400
+    page = max(1, request.args.get("page", 1, type=int))
+    page_size = min(
+        SEARCH_MAX_PAGE_SIZE, max(1, request.args.get("page_size", 20, type=int))
+    )
+    session = get_request_session()
+    service = TaskService(session)
+    # Fetch one extra row to know whether another page exists without a COUNT.
+    rows = service.search_tasks(
+        g.current_user.id, query, limit=page_size + 1, offset=(page - 1) * page_size
+    )
+    items = [
+        TaskSearchResult(
+            id=task.id,
+            prompt=task.prompt,
+            status=task.status,
+            rank=rank,
+            headline=headline,
+            created_at=task.created_at,
+        )
+        for task, rank, headline in rows[:page_size]
+    ]
+    return TaskSearchPage(
+        items=items, page=page, page_size=page_size, has_more=len(rows) > page_size
+    ).model_dump()
 
 
 @task_bp.get("/<int:task_id>")
 @clerk_required
 def get_task(task_id: int):
-    session = next(get_session())
-    try:
-        service = TaskService(session)
-        task = service.get_task(task_id, g.current_user.id)
-        if not task:
-            return {"error": "Task not found"}, 404
-        return TaskRead.model_validate(task).model_dump()
-    finally:
-        session.close()
+    session = get_request_session()
+    service = TaskService(session)
+    task = service.get_task(task_id, g.current_user.id)
+    if not task:
+        return {"error": "Task not found"}, 404
+    return TaskRead.model_validate(task).model_dump()
 
 
 @task_bp.post("/run")
 @clerk_required
 def run_task():
     payload = TaskCreate(**request.get_json(force=True))
-    session = next(get_session())
+    user_id = g.current_user.id
+    settings = Settings()
+    admission = get_admission_controller()
+    bus = get_event_bus()
+    session = get_request_session()
+    service = TaskService(session)
+    fingerprint = prompt_fingerprint(payload.prompt)
+    with single_flight(user_id, fingerprint):
+        duplicate = None
+        if not payload.fresh:
+            duplicate = find_duplicate_task(
+                service, user_id, fingerprint, settings.task_dedupe_window_s
+            )
+        if duplicate is None:
+            try:
+                ticket = admission.submit(user_id)
+            except AdmissionRejected as exc:
+                return _rejected_response(exc)
+            try:
+                task = service.create_task(user_id, payload.prompt, fingerprint)
+            except Exception:
+                admission.release(ticket)
+                raise
+            # Duplicates submitted while this runs wait on the channel for the outcome.
+            bus.open(task.id)
+    if duplicate is not None:
+        return _await_duplicate(service, duplicate, user_id, settings)
+    # create_task refreshes the row, which keeps a connection checked out; return it to
+    # the pool before waiting for a slot and the run. Later writes check out a new one.
+    session.close()
+
     try:
-        service = TaskService(session)
-        task = service.create_task(g.current_user.id, payload.prompt)
+        if not offload(admission.wait, ticket, settings.admission_queue_timeout_s):
+            service.fail_task(task.id, QUEUE_TIMEOUT_ERROR)
+            bus.publish(task.id, {"event": "error", "data": {"error": QUEUE_TIMEOUT_ERROR}})
+            return {"error": QUEUE_TIMEOUT_ERROR}, 503, {"Retry-After": "30"}
+        artifact_dir = (
+            task_artifact_dir(settings, task.id)
+            if should_capture_debug(payload.debug, settings)
+            else None
+        )
         try:
-            result = run_browser_graph(payload.prompt)
+            # Imported on first use so API-only processes never load the browser stack.
+            from app.orchestration.browser_graph import run_browser_graph
+
+            result = offload(
+                run_browser_graph,
+                payload.prompt,
+                user_id=user_id,
+                artifact_dir=artifact_dir,
+            )
             if isinstance(result, dict) and result.get("error"):
                 task = service.fail_task(task.id, str(result.get("error")))
+                bus.publish(task.id, {"event": "error", "data": {"error": task.error}})
                 return TaskRead.model_validate(task).model_dump(), 400
             task = service.complete_task(task.id, result)
+            bus.publish(task.id, {"event": "complete", "data": result})
         except Exception as exc:  # noqa: BLE001
+            session.rollback()
             task = service.fail_task(task.id, str(exc))
+            bus.publish(task.id, {"event": "error", "data": {"error": task.error}})
             return TaskRead.model_validate(task).model_dump(), 500
         return TaskRead.model_validate(task).model_dump()
     finally:
-        session.close()
+        admission.release(ticket)
+        bus.close(task.id)
+
 
 @task_bp.post("/stream")
 @clerk_required
 def stream_task():
     payload = TaskCreate(**request.get_json(force=True))
-    session = next(get_session())
-    service = TaskService(session)
-    task = service.create_task(g.current_user.id, payload.prompt)
-
-    def generate():
+    user_id = g.current_user.id
+    settings = Settings()
+    admission = get_admission_controller()
+    service = TaskService(get_request_session())
+    fingerprint = prompt_fingerprint(payload.prompt)
+    with single_flight(user_id, fingerprint):
+        if not payload.fresh:
+            duplicate = find_duplicate_task(
+                service, user_id, fingerprint, settings.task_dedupe_window_s
+            )
+            if duplicate is not None:
+                response = _task_event_response(service, duplicate, settings)
+                response.headers[DEDUPLICATED_HEADER] = str(duplicate.id)
+                return response
         try:
-            yield "event: task\n"
-            yield f"data: {json.dumps({'task_id': task.id})}\n\n"
-            for event in run_browser_graph_stream(payload.prompt, task.id):
-                if event["event"] == "complete":
-                    service.complete_task(task.id, event["data"])
-                if event["event"] == "error":
-                    service.fail_task(task.id, event["data"].get("error", "Unknown error"))
-                yield f"event: {event['event']}\n"
-                yield f"data: {json.dumps(event['data'])}\n\n"
-        finally:
-            session.close()
+            ticket = admission.submit(user_id)
+        except AdmissionRejected as exc:
+            return _rejected_response(exc)
+        try:
+            task = service.create_task(user_id, payload.prompt, fingerprint)
+            task_id = task.id
+        except Exception:
+            admission.release(ticket)
+            raise
 
-    return Response(stream_with_context(generate()), mimetype="text/event-stream")
+        artifact_dir = (
+            task_artifact_dir(settings, task_id)
+            if should_capture_debug(payload.debug, settings)
+            else None
+        )
+        # Started inside the lock so the next duplicate finds the task's channel open.
+        subscription = start_stream_task(task_id, user_id, payload.prompt, ticket, artifact_dir)
+    return subscription_response(subscription, settings.sse_heartbeat_s)
+
+
+@task_bp.get("/<int:task_id>/events")
+@clerk_required
+def task_events(task_id: int):
+    """Attach to a task's event stream; finished tasks replay their final outcome."""
+    service = TaskService(get_request_session())
+    task = service.get_task(task_id, g.current_user.id)
+    if not task:
+        return {"error": "Task not found"}, 404
+    return _task_event_response(service, task, Settings())
+
+
+@task_bp.get("/<int:task_id>/artifacts")
+@clerk_required
+def list_artifacts(task_id: int):
+    session = get_request_session()
+    if not TaskService(session).get_task(task_id, g.current_user.id):
+        return {"error": "Task not found"}, 404
+    return {"task_id": task_id, "artifacts": list_task_artifacts(Settings(), task_id)}
+
+
+@task_bp.get("/<int:task_id>/artifacts/<name>")
+@clerk_required
+def download_artifact(task_id: int, name: str):
+    session = get_request_session()
+    if not TaskService(session).get_task(task_id, g.current_user.id):
+        return {"error": "Task not found"}, 404
+    settings = Settings()
+    if name not in list_task_artifacts(settings, task_id):
+        return {"error": "Artifact not found"}, 404
+    return send_from_directory(task_artifact_dir(settings, task_id), name, as_attachment=True)
 
 
 @task_bp.post("/stop/<int:task_id>")
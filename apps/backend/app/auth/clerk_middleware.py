@@ -1,21 +1,26 @@
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Any, Callable
 
 import jwt
-from flask import g, request
+from flask import current_app, g, request
 from sqlalchemy.orm import Session
 
+from app.auth.identity_cache import CurrentUser, get_identity_cache
 from app.core.config import Settings
-from app.db.session import get_session
+from app.db.session import get_request_session
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
 
 
-def _decode_jwt(token: str) -> dict[str, Any]:
-    settings = Settings()
+@lru_cache(maxsize=4)
+def _jwk_client(jwks_url: str) -> jwt.PyJWKClient:
+    # Shared so the fetched key set is reused instead of downloaded per request.
+    return jwt.PyJWKClient(jwks_url)
+
+
+def _decode_jwt(token: str, settings: Settings) -> dict[str, Any]:
     if settings.clerk_jwks_url:
-        jwk_client = jwt.PyJWKClient(settings.clerk_jwks_url)
-        signing_key = jwk_client.get_signing_key_from_jwt(token)
+        signing_key = _jwk_client(settings.clerk_jwks_url).get_signing_key_from_jwt(token)
         return jwt.decode(
             token,
             signing_key.key,
@@ -55,6 +60,17 @@ def _get_or_create_user(session: Session, payload: dict[str, Any]) -> User:
     return repo.upsert(user)
 
 
+def _current_user(payload: dict[str, Any]) -> CurrentUser:
+    cache = get_identity_cache()
+    cached = cache.get(payload.get("sub") or "")
+    if cached:
+        return cached
+    user = _get_or_create_user(get_request_session(), payload)
+    identity = CurrentUser(id=user.id, clerk_user_id=user.clerk_user_id, email=user.email)
+    cache.put(identity)
+    return identity
+
+
 def clerk_required(handler: Callable[..., Any]) -> Callable[..., Any]:
     @wraps(handler)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -64,15 +80,11 @@ def clerk_required(handler: Callable[..., Any]) -> Callable[..., Any]:
 
         token = auth_header.split(" ", 1)[1].strip()
         try:
-            payload = _decode_jwt(token)
+            payload = _decode_jwt(token, current_app.config["SETTINGS"])
         except Exception:
             return {"error": "Unauthorized"}, 401
 
-        session = next(get_session())
-        try:
-            g.current_user = _get_or_create_user(session, payload)
-        finally:
-            session.close()
+        g.current_user = _current_user(payload)
 
         return handler(*args, **kwargs)
 
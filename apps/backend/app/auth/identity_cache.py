@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import Settings
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """The identity handlers see as ``g.current_user``; detached from any session."""
+
+    id: int
+    clerk_user_id: str
+    email: str
+
+
+class IdentityCache:
+    """Short-lived clerk_user_id -> CurrentUser map so auth skips the user SELECT.
+
+    Entries expire after ``ttl_s`` and the least recently used are evicted beyond
+    ``max_entries``; a deleted user stays authorized for at most one TTL.
+    """
+
+    def __init__(self, ttl_s: float, max_entries: int) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, CurrentUser]] = OrderedDict()
+
+    def get(self, clerk_user_id: str) -> CurrentUser | None:
+        with self._lock:
+            entry = self._entries.get(clerk_user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[clerk_user_id]
+                return None
+            self._entries.move_to_end(clerk_user_id)
+            return user
+
+    def put(self, user: CurrentUser) -> None:
+        if self.ttl_s <= 0:
+            return
+        with self._lock:
+            self._entries[user.clerk_user_id] = (time.monotonic() + self.ttl_s, user)
+            self._entries.move_to_end(user.clerk_user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, clerk_user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(clerk_user_id, None)
+
+
+_CACHE: IdentityCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_identity_cache() -> IdentityCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            settings = Settings()
+            _CACHE = IdentityCache(
+                settings.auth_identity_cache_ttl_s, settings.auth_identity_cache_size
+            )
+        return _CACHE
@@ -0,0 +1,87 @@
+import sys
+import threading
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def gevent_active() -> bool:
+    """True when the process was monkey-patched for the gevent serving mode."""
+    if "gevent" not in sys.modules:
+        return False
+    from gevent import monkey
+
+    return monkey.is_module_patched("socket")
+
+
+def offload(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking work (Playwright, lock waits) without stalling the gevent hub.
+
+    Under gevent the call moves to the hub's native thread pool and the calling
+    greenlet yields until it finishes; otherwise it simply runs inline.
+    """
+    if not gevent_active():
+        return fn(*args, **kwargs)
+    from gevent import get_hub
+
+    return get_hub().threadpool.apply(fn, args, kwargs)
+
+
+class _ThreadWaker:
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def notify(self) -> None:
+        self._event.set()
+
+    def clear(self) -> None:
+        self._event.clear()
+
+    def wait(self, timeout: float) -> bool:
+        return self._event.wait(timeout)
+
+    def close(self) -> None:
+        pass
+
+
+class _GeventWaker:
+    """Wakes a greenlet from any native thread via a libev async watcher."""
+
+    def __init__(self) -> None:
+        from gevent import get_hub
+        from gevent.event import Event
+
+        self._event = Event()
+        self._watcher = get_hub().loop.async_()
+        self._watcher.start(self._event.set)
+
+    def notify(self) -> None:
+        self._watcher.send()
+
+    def clear(self) -> None:
+        self._event.clear()
+
+    def wait(self, timeout: float) -> bool:
+        return self._event.wait(timeout)
+
+    def close(self) -> None:
+        self._watcher.stop()
+        self._watcher.close()
+
+
+def new_waker() -> _ThreadWaker | _GeventWaker:
+    return _GeventWaker() if gevent_active() else _ThreadWaker()
+
+
+def new_lock() -> Any:
+    """A mutex for code run by request handlers.
+
+    Under gevent, handlers are greenlets sharing the hub's thread, so a native lock held
+    across a yield (a database round trip, for one) would block the hub itself.
+    """
+    if not gevent_active():
+        return threading.Lock()
+    from gevent.lock import Semaphore
+
+    return Semaphore()
@@ -1,5 +1,13 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+InteractionProfile = Literal["fast", "humanized", "keyboard"]
+HarMode = Literal["off", "record", "replay"]
+ServerMode = Literal["dev", "gevent"]
+ScreenshotFormat = Literal["jpeg", "png", "webp"]
+ModelTier = Literal["standard", "fast"]
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -9,14 +17,87 @@ class Settings(BaseSettings):
     )
 
     database_url: str = ""
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_s: float = 30.0
+    db_pool_recycle_s: int = 1800
     clerk_jwt_public_key: str = ""
     clerk_jwks_url: str = ""
+    auth_identity_cache_ttl_s: float = 60.0
+    auth_identity_cache_size: int = 10000
     gemini_api_key: str = ""
     gemini_model: str = "gemini-2.5-flash"
+    gemini_fast_model: str = "gemini-2.5-flash-lite"
+    gemini_fallback_model: str = "gemini-2.0-flash"
+    # Per call type (plan, replan, diagnose, summarize_plan, summarize_execution)
+    # overrides of the defaults in app/llm/routing.py.
+    llm_routes: dict[str, ModelTier] = {}
+    llm_deadlines_s: dict[str, float] = {}
+    llm_hedge_after_s: dict[str, float] = {}
+    llm_max_workers: int = 16
+
+    server_mode: ServerMode = "dev"
+    server_host: str = "0.0.0.0"
+    server_port: int = 8005
+    server_max_connections: int = 10000
+    sse_heartbeat_s: float = 15.0
+    event_history_size: int = 200
+    event_subscriber_buffer: int = 256
 
     playwright_headed: bool = True
     playwright_slow_mo_ms: int = 0
     playwright_capture_step_screenshots: bool = False
     playwright_capture_dom_snapshot: bool = True
     playwright_default_timeout_ms: int = 3000
+    playwright_max_parallel_groups: int = 4
+    screenshot_full_page: bool = False
+    screenshot_format: ScreenshotFormat = "jpeg"
+    screenshot_quality: int = 75
+    screenshot_max_dimension: int = 1600
+    screenshot_thumbnail_size: int = 320
+    screenshot_workers: int = 2
+    interaction_default_profile: InteractionProfile = "fast"
+    interaction_domain_profiles: dict[str, InteractionProfile] = {}
+    http_cache_enabled: bool = False
+    http_cache_dir: str = ".cache/http"
+    http_cache_max_bytes: int = 512 * 1024 * 1024
+    http_har_mode: HarMode = "off"
+    http_har_dir: str = ".cache/har"
+    extract_structured_max_rows: int = 200
+    extract_structured_max_scrolls: int = 10
+    extract_structured_scroll_wait_ms: int = 500
     planner_max_attempts: int = 2
+    # Identical prompts from one user reuse a task completed this recently (0 = only
+    # attach to tasks still running).
+    task_dedupe_window_s: int = 300
+    plan_optimizer_enabled: bool = True
+    plan_precheck_selectors: bool = True
+    # How long a pre-check lets selectors render before failing the step; kept well below
+    # playwright_default_timeout_ms so a missing selector fails sooner than the step would.
+    plan_precheck_grace_ms: int = 1500
+
+    # Per-task Playwright trace + Python profile; also forced per request with debug=true.
+    debug_sample_rate: float = 0.0
+    debug_artifacts_dir: str = ".artifacts"
+    debug_profile_interval_ms: int = 10
+
+    # Recurring monitors; the scheduler thread runs in every API process that enables it
+    # (claims use SKIP LOCKED, so several processes never run the same check twice).
+    monitor_scheduler_enabled: bool = False
+    monitor_poll_interval_s: float = 30.0
+    monitor_max_concurrency: int = 2
+    monitor_min_interval_minutes: int = 5
+    monitor_notify_timeout_s: float = 10.0
+    monitor_diff_max_lines: int = 40
+
+    # 0 derives the browser limit from available cores and memory.
+    admission_max_browsers: int = 0
+    admission_browser_memory_mb: int = 512
+    admission_per_user_concurrency: int = 2
+    admission_per_user_per_minute: int = 10
+    admission_queue_size: int = 50
+    admission_queue_timeout_s: int = 300
+
+    # Fernet key; persisting browser storage state is disabled while it is empty.
+    browser_state_encryption_key: str = ""
+    browser_state_ttl_hours: int = 168
@@ -0,0 +1,44 @@
+import ipaddress
+import socket
+from urllib.parse import urlparse
+
+
+def domain_of(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host.removeprefix("www.")
+
+
+def domain_matches(host: str, domain: str) -> bool:
+    """True when ``host`` is ``domain`` or one of its subdomains (or parents, for cookies)."""
+    host = host.lower().lstrip(".").removeprefix("www.")
+    return host == domain or host.endswith(f".{domain}") or domain.endswith(f".{host}")
+
+
+def check_public_url(url: str) -> str:
+    """Return ``url`` if it is http(s) and every address its host resolves to is public.
+
+    Guards server-side requests to user-supplied URLs (such as monitor webhooks) from
+    reaching loopback, private, link-local or reserved addresses.
+    """
+    resolve_public_url(url)
+    return url
+
+
+def resolve_public_url(url: str) -> str:
+    """Like ``check_public_url`` but returns the checked address to connect to.
+
+    Connecting to this address rather than resolving the host again keeps a DNS
+    rebinding host from passing the check and then pointing somewhere internal.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("URL must be http or https with a host")
+    try:
+        infos = socket.getaddrinfo(parsed.hostname, parsed.port or None, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError, ValueError) as exc:
+        raise ValueError(f"cannot resolve {parsed.hostname}") from exc
+    addresses = [ipaddress.ip_address(info[4][0].split("%", 1)[0]) for info in infos]
+    for address in addresses:
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"{parsed.hostname} resolves to a non-public address")
+    return str(addresses[0])
@@ -1,24 +1,86 @@
+import threading
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
+from flask import g
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
-
-from app.db.base import Base
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
 
 _ENGINE = None
 _SessionLocal = None
 
 
-def init_db(database_url: str) -> None:
+class CooperativeQueuePool(QueuePool):
+    """QueuePool for the gevent serving mode.
+
+    QueuePool waits for a free connection on a native lock, which would stall the hub
+    and every greenlet on it. Greenlets wait on a gevent semaphore sized like the pool
+    instead, so the pool itself never has to wait: native threads (task runners, the
+    monitor scheduler) that find it empty open an overflow connection.
+    """
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw) -> None:
+        from gevent.lock import BoundedSemaphore
+
+        super().__init__(creator, pool_size=pool_size, max_overflow=-1, **kw)
+        self._greenlet_slots = BoundedSemaphore(pool_size + max(0, max_overflow))
+        self._greenlet_records: set[ConnectionPoolEntry] = set()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        # Greenlets all run on the main thread; any other thread is a native worker.
+        if threading.current_thread() is not threading.main_thread():
+            return super()._do_get()
+        if not self._greenlet_slots.acquire(timeout=self._timeout):
+            raise exc.TimeoutError(
+                f"QueuePool limit reached, connection timed out, timeout {self._timeout:.2f}"
+            )
+        try:
+            record = super()._do_get()
+        except BaseException:
+            self._greenlet_slots.release()
+            raise
+        self._greenlet_records.add(record)
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        try:
+            super()._do_return_conn(record)
+        finally:
+            if record in self._greenlet_records:
+                self._greenlet_records.discard(record)
+                self._greenlet_slots.release()
+
+
+def init_db(
+    database_url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout_s: float = 30.0,
+    pool_recycle_s: int = 1800,
+    cooperative: bool = False,
+) -> None:
     global _ENGINE, _SessionLocal
-    _ENGINE = create_engine(database_url, pool_pre_ping=True)
+    _ENGINE = create_engine(
+        database_url,
+        poolclass=CooperativeQueuePool if cooperative else QueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout_s,
+        pool_recycle=pool_recycle_s,
+    )
     _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_ENGINE)
 
-    # Ensure models are registered before creating tables.
+    # Ensure models are registered so relationships resolve. The schema itself is
+    # managed by Alembic migrations (`alembic upgrade head`), applied out of band.
     from app import models  # noqa: F401
 
-    # TODO: replace with Alembic migrations for production use.
-    Base.metadata.create_all(bind=_ENGINE)
+
+def get_engine() -> Engine:
+    if _ENGINE is None:
+        raise RuntimeError("Database not initialized")
+    return _ENGINE
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -29,3 +91,22 @@ def get_session() -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+
+
+def get_request_session() -> Session:
+    """The session for the current request, shared by auth and the handler.
+
+    Opened on first use and closed by ``close_request_session`` at app-context
+    teardown. Work that outlives the request (task threads) uses ``get_session``.
+    """
+    if "db_session" not in g:
+        if _SessionLocal is None:
+            raise RuntimeError("Database not initialized")
+        g.db_session = _SessionLocal()
+    return g.db_session
+
+
+def close_request_session(_exc: BaseException | None = None) -> None:
+    session = g.pop("db_session", None)
+    if session is not None:
+        session.close()
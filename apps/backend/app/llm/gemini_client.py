@@ -1,9 +1,15 @@
 from typing import Literal
 
-from google import genai
 from pydantic import BaseModel, Field
 
 from app.core.config import Settings
+from app.llm.routing import LLMCallError, get_model_router
+
+
+class ExtractField(BaseModel):
+    name: str
+    selector: str | None = None
+    attribute: str | None = None
 
 
 class BrowserStep(BaseModel):
@@ -14,18 +20,33 @@ class BrowserStep(BaseModel):
         "wait_for",
         "screenshot",
         "extract_text",
+        "extract_structured",
         "scroll",
     ]
     url: str | None = None
     selector: str | None = None
     text: str | None = None
     wait_ms: int | None = None
+    fields: list[ExtractField] | None = None
+    limit: int | None = None
+    max_scrolls: int | None = None
     description: str | None = None
 
 
+class BrowserStepGroup(BaseModel):
+    name: str = Field(default="")
+    steps: list[BrowserStep]
+
+
 class BrowserPlan(BaseModel):
     goal: str = Field(default="")
     steps: list[BrowserStep]
+    groups: list[BrowserStepGroup] = Field(default_factory=list)
+
+
+def _http_timeout(timeout_s: float) -> dict:
+    """genai takes per-request HTTP timeouts in milliseconds."""
+    return {"timeout": max(1, int(timeout_s * 1000))}
 
 
 class GeminiClient:
@@ -35,17 +56,64 @@ class GeminiClient:
         self.model = settings.gemini_model
         if not self.api_key or not self.model:
             raise ValueError("GEMINI_API_KEY and GEMINI_MODEL must be set")
-        self.client = genai.Client(api_key=self.api_key)
+        from google import genai
+
+        self.router = get_model_router()
+        # Each request passes its own timeout; this only bounds calls made outside the router.
+        self.client = genai.Client(
+            api_key=self.api_key,
+            http_options={"timeout": int(self.router.max_deadline_s * 1000)},
+        )
+
+    def _plan_call(self, call_type: str, contents: list[dict]) -> BrowserPlan:
+        def request(model: str, timeout_s: float) -> BrowserPlan:
+            response = self.client.models.generate_content(
+                model=model,
+                contents=contents,
+                config={
+                    "response_mime_type": "application/json",
+                    "response_schema": BrowserPlan,
+                    "http_options": _http_timeout(timeout_s),
+                },
+            )
+            return BrowserPlan.model_validate(response.parsed)
+
+        return self.router.call(call_type, request)
+
+    def _text_call(self, call_type: str, contents: list[dict]) -> str:
+        """Text calls are advisory, so a miss yields an empty string instead of failing."""
+
+        def request(model: str, timeout_s: float) -> str:
+            response = self.client.models.generate_content(
+                model=model, contents=contents, config={"http_options": _http_timeout(timeout_s)}
+            )
+            if not response.text:
+                raise ValueError("empty response")
+            return response.text
+
+        try:
+            return self.router.call(call_type, request)
+        except LLMCallError:
+            return ""
 
     def plan_browser_task(self, prompt: str) -> BrowserPlan:
         """Plan a multi-step browser task using Gemini structured output."""
         system = (
             "You are a browser automation planner. "
             "Return a JSON plan with an ordered list of steps. "
-            "Use actions: goto, click, type, wait_for, screenshot, extract_text, scroll. "
+            "Use actions: goto, click, type, wait_for, screenshot, extract_text, "
+            "extract_structured, scroll. "
             "Each step may include url, selector, text, wait_ms, description. "
+            "To scrape a list of results use a single extract_structured step: selector is "
+            "the repeated container (one per record), fields lists {name, selector, attribute} "
+            "with selectors relative to the container (omit attribute for text), limit caps "
+            "the rows and max_scrolls allows scrolling to load more. "
             "Keep selectors stable and prefer data-testid when possible. "
             "Ensure the first step is goto with a URL if provided in the prompt. "
+            "When the objective splits into independent subtasks (for example comparing "
+            "several sites), put each subtask in groups as {name, steps} instead of steps. "
+            "Groups run in parallel on separate pages after the top-level steps, so each "
+            "group must start with its own goto and must not depend on another group. "
             "Prefer DuckDuckGo over Google for search. "
             "If a CAPTCHA or 'I'm not a robot' checkbox appears, include a click step for it. "
             "Use the selector iframe[title*='reCAPTCHA'] and then click the checkbox "
@@ -53,20 +121,14 @@ class GeminiClient:
             "Assume a human will complete any remaining challenge."
         )
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[
+        return self._plan_call(
+            "plan",
+            [
                 {"role": "user", "parts": [{"text": system}]},
                 {"role": "user", "parts": [{"text": prompt}]},
             ],
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": BrowserPlan,
-            },
         )
 
-        return BrowserPlan.model_validate(response.parsed)
-
     def replan_browser_task(
         self,
         prompt: str,
@@ -81,8 +143,13 @@ class GeminiClient:
         system = (
             "You are a browser automation planner. The previous plan failed. "
             "Return a revised JSON plan with an ordered list of steps. "
-            "Use actions: goto, click, type, wait_for, screenshot, extract_text, scroll. "
+            "Use actions: goto, click, type, wait_for, screenshot, extract_text, "
+            "extract_structured, scroll. "
+            "Use extract_structured (container selector, fields, limit, max_scrolls) "
+            "for lists instead of many extract_text steps. "
             "Fix the failed step by choosing a better selector or adding waits. "
+            "Keep independent subtasks in groups ({name, steps}, each starting with goto); "
+            "groups run in parallel on separate pages after the top-level steps. "
             "Prefer DuckDuckGo over Google for search. "
             "If a CAPTCHA or 'I'm not a robot' checkbox appears, include a click step for it. "
             "Use the selector iframe[title*='reCAPTCHA'] and then click the checkbox "
@@ -91,9 +158,9 @@ class GeminiClient:
             "If the page is already at the correct URL, you may omit goto."
         )
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[
+        return self._plan_call(
+            "replan",
+            [
                 {"role": "user", "parts": [{"text": system}]},
                 {"role": "user", "parts": [{"text": f"Prompt: {prompt}"}]},
                 {
@@ -106,14 +173,8 @@ class GeminiClient:
                 {"role": "user", "parts": [{"text": f"Step results: {step_results}"}]},
                 {"role": "user", "parts": [{"text": f"DOM snapshot: {dom_snapshot}"}]},
             ],
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": BrowserPlan,
-            },
         )
 
-        return BrowserPlan.model_validate(response.parsed)
-
     def diagnose_failure(
         self,
         prompt: str,
@@ -125,9 +186,9 @@ class GeminiClient:
         dom_snapshot: str,
     ) -> str:
         """Explain why a step likely failed and suggest a fix in 1-2 sentences."""
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[
+        return self._text_call(
+            "diagnose",
+            [
                 {
                     "role": "user",
                     "parts": [
@@ -151,13 +212,12 @@ class GeminiClient:
                 {"role": "user", "parts": [{"text": f"DOM snapshot: {dom_snapshot}"}]},
             ],
         )
-        return response.text or ""
 
     def summarize_execution(self, prompt: str, result: dict) -> str:
         """Generate short feedback for the executed plan."""
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[
+        return self._text_call(
+            "summarize_execution",
+            [
                 {
                     "role": "user",
                     "parts": [
@@ -173,13 +233,12 @@ class GeminiClient:
                 {"role": "user", "parts": [{"text": f"Result JSON: {result}"}]},
             ],
         )
-        return response.text or ""
 
     def summarize_plan(self, prompt: str, plan: BrowserPlan) -> str:
         """Summarize the plan in 1-2 sentences for UI."""
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[
+        return self._text_call(
+            "summarize_plan",
+            [
                 {
                     "role": "user",
                     "parts": [
@@ -195,4 +254,3 @@ class GeminiClient:
                 {"role": "user", "parts": [{"text": f"Plan: {plan.model_dump()}"}]},
             ],
         )
-        return response.text or ""
@@ -0,0 +1,255 @@
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TypeVar
+
+from app.core.config import ModelTier, Settings
+
+T = TypeVar("T")
+
+# Planning needs the strongest model; the rest only has to be quick and readable.
+DEFAULT_ROUTES: dict[str, ModelTier] = {
+    "plan": "standard",
+    "replan": "standard",
+    "diagnose": "fast",
+    "summarize_plan": "fast",
+    "summarize_execution": "fast",
+}
+DEFAULT_DEADLINES_S = {
+    "plan": 45.0,
+    "replan": 45.0,
+    "diagnose": 15.0,
+    "summarize_plan": 10.0,
+    "summarize_execution": 15.0,
+}
+DEFAULT_HEDGE_AFTER_S = {
+    "plan": 12.0,
+    "replan": 12.0,
+    "diagnose": 4.0,
+    "summarize_plan": 3.0,
+    "summarize_execution": 4.0,
+}
+
+
+class LLMCallError(Exception):
+    def __init__(self, call_type: str, reason: str) -> None:
+        super().__init__(f"{call_type}: {reason}")
+        self.call_type = call_type
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class Route:
+    call_type: str
+    model: str
+    fallback_model: str
+    deadline_s: float
+    hedge_after_s: float
+
+    @property
+    def hedges(self) -> bool:
+        return bool(self.fallback_model) and 0 < self.hedge_after_s < self.deadline_s
+
+
+class RoutingStats:
+    """Per (call type, model) outcomes of every attempt, primary or hedge."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: dict[tuple[str, str], dict[str, int]] = defaultdict(
+            lambda: {"attempts": 0, "ok": 0, "errors": 0, "wins": 0, "hedged_wins": 0}
+        )
+        self._latencies: dict[tuple[str, str], deque[float]] = defaultdict(
+            lambda: deque(maxlen=200)
+        )
+        self._calls: dict[str, dict[str, int]] = defaultdict(
+            lambda: {
+                "calls": 0,
+                "hedged": 0,
+                "hedges_skipped": 0,
+                "failed": 0,
+                "deadline_exceeded": 0,
+            }
+        )
+
+    def record_attempt(self, call_type: str, model: str, ok: bool, latency_s: float) -> None:
+        with self._lock:
+            counts = self._counts[(call_type, model)]
+            counts["attempts"] += 1
+            counts["ok" if ok else "errors"] += 1
+            if ok:
+                self._latencies[(call_type, model)].append(latency_s)
+
+    def record_call(
+        self,
+        call_type: str,
+        winner: tuple[str, bool] | None,
+        hedged: bool,
+        deadline_exceeded: bool,
+        hedge_skipped: bool = False,
+    ) -> None:
+        with self._lock:
+            calls = self._calls[call_type]
+            calls["calls"] += 1
+            calls["hedged"] += int(hedged)
+            calls["hedges_skipped"] += int(hedge_skipped)
+            calls["failed"] += int(winner is None)
+            calls["deadline_exceeded"] += int(deadline_exceeded)
+            if winner is not None:
+                counts = self._counts[(call_type, winner[0])]
+                counts["wins"] += 1
+                counts["hedged_wins"] += int(winner[1])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = []
+            for (call_type, model), counts in sorted(self._counts.items()):
+                latencies = sorted(self._latencies[(call_type, model)])
+                models.append(
+                    {
+                        "call_type": call_type,
+                        "model": model,
+                        **counts,
+                        "latency_p50_s": (
+                            round(latencies[len(latencies) // 2], 3) if latencies else 0.0
+                        ),
+                        "latency_p95_s": (
+                            round(latencies[int(len(latencies) * 0.95)], 3) if latencies else 0.0
+                        ),
+                    }
+                )
+            return {"calls": dict(self._calls), "models": models}
+
+
+class ModelRouter:
+    """Sends each call type to its model tier with a deadline and a hedged fallback.
+
+    The primary request starts immediately. If it has not produced a valid response
+    after ``hedge_after_s`` (or fails outright), the same request goes to the fallback
+    model and whichever valid response arrives first wins. Losing requests are left
+    to finish in the background; only their outcome is recorded. Every attempt is
+    given what is left of the deadline as its HTTP timeout, so an abandoned attempt
+    holds its worker no longer than the call it belonged to, and no hedge is started
+    while all workers are busy.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.tier_models = {"standard": settings.gemini_model, "fast": settings.gemini_fast_model}
+        self.fallback_model = settings.gemini_fallback_model
+        self.routes = {**DEFAULT_ROUTES, **settings.llm_routes}
+        self.deadlines_s = {**DEFAULT_DEADLINES_S, **settings.llm_deadlines_s}
+        self.hedge_after_s = {**DEFAULT_HEDGE_AFTER_S, **settings.llm_hedge_after_s}
+        self.stats = RoutingStats()
+        self.max_workers = max(2, settings.llm_max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm")
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def max_deadline_s(self) -> float:
+        return max(self.deadlines_s.values())
+
+    def route(self, call_type: str) -> Route:
+        model = self.tier_models[self.routes.get(call_type, "standard")]
+        fallback = self.fallback_model if self.fallback_model != model else ""
+        return Route(
+            call_type=call_type,
+            model=model,
+            fallback_model=fallback,
+            deadline_s=self.deadlines_s.get(call_type, max(DEFAULT_DEADLINES_S.values())),
+            hedge_after_s=self.hedge_after_s.get(call_type, 0.0),
+        )
+
+    def call(self, call_type: str, request: Callable[[str, float], T]) -> T:
+        """Run ``request(model, timeout_s)`` under the call type's route.
+
+        ``timeout_s`` is the time left before the deadline and should bound the HTTP
+        request. ``request`` must raise when the response is unusable so a hedge can
+        still win.
+        """
+        route = self.route(call_type)
+        started = time.monotonic()
+        deadline = started + route.deadline_s
+        pending: dict[Future, tuple[str, bool]] = {
+            self._submit(call_type, route.model, request, deadline): (route.model, False)
+        }
+        hedged = False
+        hedge_skipped = False
+        errors: list[str] = []
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            timeout = deadline - now
+            if route.hedges and not hedged:
+                timeout = min(timeout, max(0.0, started + route.hedge_after_s - now))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                model, is_hedge = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    errors.append(f"{model}: {exc}")
+                    continue
+                self.stats.record_call(call_type, (model, is_hedge), hedged, False)
+                return value
+            if (
+                route.hedges
+                and not hedged
+                and not hedge_skipped
+                and (not pending or time.monotonic() >= started + route.hedge_after_s)
+            ):
+                # With every worker busy a hedge would only queue behind slow requests.
+                if self._in_flight >= self.max_workers:
+                    hedge_skipped = True
+                    continue
+                hedged = True
+                future = self._submit(call_type, route.fallback_model, request, deadline)
+                pending[future] = (route.fallback_model, True)
+
+        deadline_exceeded = bool(pending)
+        self.stats.record_call(call_type, None, hedged, deadline_exceeded, hedge_skipped)
+        if deadline_exceeded:
+            raise LLMCallError(call_type, f"no valid response within {route.deadline_s}s")
+        raise LLMCallError(call_type, "; ".join(errors) or "no valid response")
+
+    def _submit(
+        self, call_type: str, model: str, request: Callable[[str, float], T], deadline: float
+    ) -> Future:
+        with self._in_flight_lock:
+            self._in_flight += 1
+        return self._pool.submit(self._attempt, call_type, model, request, deadline)
+
+    def _attempt(
+        self, call_type: str, model: str, request: Callable[[str, float], T], deadline: float
+    ) -> T:
+        try:
+            started = time.monotonic()
+            # Attempts queued behind busy workers get only what is left of the deadline.
+            if deadline - started <= 0:
+                raise TimeoutError("deadline passed before the request started")
+            try:
+                value = request(model, deadline - started)
+            except Exception:
+                self.stats.record_attempt(call_type, model, False, time.monotonic() - started)
+                raise
+            self.stats.record_attempt(call_type, model, True, time.monotonic() - started)
+            return value
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+
+
+_ROUTER: ModelRouter | None = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            _ROUTER = ModelRouter(Settings())
+        return _ROUTER
@@ -1,4 +1,6 @@
 from app.models.user import User
 from app.models.task import Task
+from app.models.browser_storage_state import BrowserStorageState
+from app.models.monitor import Monitor
 
-__all__ = ["User", "Task"]
+__all__ = ["User", "Task", "BrowserStorageState", "Monitor"]
@@ -16,3 +16,7 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     tasks = relationship("Task", back_populates="user", cascade="all, delete-orphan")
+    storage_states = relationship(
+        "BrowserStorageState", back_populates="user", cascade="all, delete-orphan"
+    )
+    monitors = relationship("Monitor", back_populates="user", cascade="all, delete-orphan")
@@ -1,13 +1,40 @@
-import base64
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
 from typing import TypedDict
 
 from langgraph.graph import StateGraph
 from playwright.sync_api import sync_playwright
 
 from app.core.config import Settings
-from app.llm.gemini_client import BrowserPlan, GeminiClient
-from app.orchestration.runtime.artifacts import truncate_text
+from app.llm.gemini_client import BrowserPlan, BrowserStepGroup, GeminiClient
+from app.orchestration.runtime.admission import get_admission_controller
+from app.orchestration.runtime.artifacts import PROFILE_FILE, TRACE_FILE, truncate_text
+from app.orchestration.runtime.extraction import extract_structured
+from app.orchestration.runtime.http_cache import MAIN_HAR, install_network_layer, task_har_dir
+from app.orchestration.runtime.interaction import perform_click
+from app.orchestration.runtime.plan_optimizer import (
+    find_missing_selectors,
+    optimize_plan,
+    upcoming_selectors,
+)
+from app.orchestration.runtime.profiler import (
+    active_sampler,
+    profile_current_thread,
+    sample_thread,
+)
+from app.orchestration.runtime.screenshots import (
+    PendingScreenshot,
+    capture_screenshot,
+    screenshot_fields,
+)
 from app.orchestration.runtime.session_store import ACTIVE_SESSIONS, SessionState
+from app.orchestration.runtime.storage_state import (
+    load_storage_state,
+    save_storage_state,
+    storage_state_enabled,
+)
 
 
 class BrowserState(TypedDict):
@@ -15,12 +42,28 @@ class BrowserState(TypedDict):
     plan: BrowserPlan
     result: dict
     feedback: str
+    user_id: int | None
+    # Set when the task runs in debug mode; traces and profiles are written here.
+    artifact_dir: str | None
 
 
 def _plan_task(state: BrowserState) -> BrowserState:
     client = GeminiClient()
-    plan = client.plan_browser_task(state["prompt"])
-    return {"prompt": state["prompt"], "plan": plan, "result": {}, "feedback": ""}
+    plan = _prepare_plan(client.plan_browser_task(state["prompt"]), Settings())
+    return {
+        "prompt": state["prompt"],
+        "plan": plan,
+        "result": {},
+        "feedback": "",
+        "user_id": state["user_id"],
+        "artifact_dir": state["artifact_dir"],
+    }
+
+
+def _prepare_plan(plan: BrowserPlan, settings: Settings) -> BrowserPlan:
+    if not settings.plan_optimizer_enabled:
+        return plan
+    return optimize_plan(plan, settings.playwright_default_timeout_ms)
 
 
 def _capture_dom_snapshot(page, settings: Settings) -> str:
@@ -53,21 +96,10 @@ def _execute_step(
             if not step.selector:
                 raise ValueError("click requires selector")
             logs.append(f"[click] {step.selector}")
-            locator = page.locator(step.selector).first
-            box = locator.bounding_box()
-            if box:
-                import random
-
-                x = box["x"] + box["width"] / 2
-                y = box["y"] + box["height"] / 2
-                jitter = random.uniform(2, 6)
-                page.mouse.move(x - jitter, y - jitter, steps=8)
-                page.mouse.move(x + jitter, y + jitter, steps=6)
-                page.mouse.move(x, y, steps=4)
-                page.mouse.click(x, y, delay=random.randint(30, 120))
-            else:
-                locator.click()
-            step_results.append({"action": "click", "selector": step.selector, "ok": True})
+            profile = perform_click(page, step.selector, settings)
+            step_results.append(
+                {"action": "click", "selector": step.selector, "profile": profile, "ok": True}
+            )
         elif step.action == "type":
             if not step.selector:
                 raise ValueError("type requires selector")
@@ -118,14 +150,42 @@ def _execute_step(
                     "ok": True,
                 }
             )
+        elif step.action == "extract_structured":
+            if not step.selector:
+                raise ValueError("extract_structured requires selector")
+            logs.append(f"[extract_structured] {step.selector}")
+            fields = [field.model_dump() for field in step.fields or []] or [{"name": "text"}]
+            limit = min(
+                step.limit or settings.extract_structured_max_rows,
+                settings.extract_structured_max_rows,
+            )
+            extracted = extract_structured(
+                page,
+                step.selector,
+                fields,
+                limit=limit,
+                max_scrolls=min(step.max_scrolls or 0, settings.extract_structured_max_scrolls),
+                scroll_wait_ms=step.wait_ms or settings.extract_structured_scroll_wait_ms,
+            )
+            step_results.append(
+                {
+                    "action": "extract_structured",
+                    "selector": step.selector,
+                    "records": extracted["rows"],
+                    "count": len(extracted["rows"]),
+                    "scrolls": extracted["scrolls"],
+                    "ok": True,
+                }
+            )
         elif step.action == "screenshot":
-            logs.append("[screenshot]")
-            screenshot_bytes = page.screenshot(full_page=True)
-            last_screenshot = base64.b64encode(screenshot_bytes).decode("ascii")
-            step_results.append({"action": "screenshot", "ok": True})
+            last_screenshot = capture_screenshot(page, settings)
+            logs.append(f"[screenshot] captured in {last_screenshot.stats['capture_ms']}ms")
+            step_results.append(
+                {"action": "screenshot", "ok": True, "screenshot": last_screenshot.stats}
+            )
         else:
             step_results.append({"action": step.action, "ok": False, "error": "Unknown action"})
-            return False, "Unknown action", last_screenshot
+            return False, "Unknown action", last_screenshot, failure_screenshot
     except Exception as exc:  # noqa: BLE001
         error = str(exc)
         logs.append(f"[error] {error}")
@@ -140,8 +200,7 @@ def _execute_step(
         )
         if settings.playwright_capture_step_screenshots:
             try:
-                step_shot = page.screenshot(full_page=True)
-                failure_screenshot = base64.b64encode(step_shot).decode("ascii")
+                failure_screenshot = capture_screenshot(page, settings)
             except Exception:  # noqa: BLE001
                 pass
         return False, error, last_screenshot, failure_screenshot
@@ -149,20 +208,296 @@ def _execute_step(
     return True, "", last_screenshot, failure_screenshot
 
 
+def _precheck_selectors(
+    page, steps, index: int, settings: Settings, logs: list[str], step_results: list[dict]
+) -> str:
+    """Fail fast when the selectors of the upcoming page segment are not on the page.
+
+    Without this, each missing selector costs a full default timeout, possibly after
+    part of the segment already ran. Checked together, a broken segment fails within
+    one short grace period before any of its steps run. Inconclusive checks never
+    fail the step.
+    """
+    if not settings.plan_precheck_selectors:
+        return ""
+    selectors = upcoming_selectors(steps, index)
+    if not selectors:
+        return ""
+    try:
+        missing = find_missing_selectors(page, selectors, settings.plan_precheck_grace_ms)
+    except Exception:  # noqa: BLE001
+        return ""
+    if not missing:
+        return ""
+    error = f"Selector(s) not found on page: {', '.join(missing)}"
+    logs.append(f"[precheck] {error}")
+    step_results.append(
+        {"action": "precheck", "ok": False, "error": error, "selectors": missing, "url": page.url}
+    )
+    return error
+
+
+def _run_step(
+    page,
+    steps,
+    index: int,
+    settings: Settings,
+    logs: list[str],
+    step_results: list[dict],
+    step_artifacts: list[dict],
+):
+    error = _precheck_selectors(page, steps, index, settings, logs, step_results)
+    if error:
+        return False, error, None, None
+    return _execute_step(page, steps[index], settings, logs, step_results, step_artifacts)
+
+
+def _launch_browser(p, settings: Settings):
+    return p.chromium.launch(
+        headless=not settings.playwright_headed, slow_mo=settings.playwright_slow_mo_ms
+    )
+
+
+def _new_page(
+    browser, settings: Settings, storage_state: dict | None = None, har_path: Path | None = None
+):
+    context = browser.new_context(storage_state=storage_state)
+    install_network_layer(context, settings, har_path)
+    page = context.new_page()
+    page.set_default_timeout(settings.playwright_default_timeout_ms)
+    return page
+
+
+def _close_browser(browser) -> None:
+    # Close contexts first so HAR recordings are flushed to disk.
+    for context in browser.contexts:
+        try:
+            context.close()
+        except Exception:  # noqa: BLE001
+            pass
+    browser.close()
+
+
+def _start_trace(page, trace_path: Path | None) -> None:
+    if trace_path is not None:
+        page.context.tracing.start(screenshots=True, snapshots=True, sources=False)
+
+
+def _stop_trace(page, trace_path: Path | None) -> None:
+    if trace_path is None:
+        return
+    try:
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        page.context.tracing.stop(path=str(trace_path))
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def _goto_urls(steps) -> list[str]:
+    return [step.url for step in steps if step.action == "goto" and step.url]
+
+
+def _plan_urls(plan: BrowserPlan) -> list[str]:
+    urls = _goto_urls(plan.steps)
+    for group in plan.groups:
+        urls.extend(_goto_urls(group.steps))
+    return urls
+
+
+def _run_step_group(
+    index: int,
+    group: BrowserStepGroup,
+    settings: Settings,
+    storage_state: dict | None = None,
+    capture_state: bool = False,
+    trace_path: Path | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    har_path: Path | None = None,
+    browser=None,
+) -> dict:
+    """Run one independent step group on its own page.
+
+    Playwright's sync API is bound to the thread that started it, so a group run on
+    a worker thread gets its own driver and browser instead of sharing the caller's.
+    Given ``browser``, the group runs in a new context of that browser, which must
+    belong to the calling thread. ``should_stop`` is checked before each step so a
+    stop request ends the group early.
+    """
+    logs: list[str] = [f"[group {index}] {group.name}"]
+    step_results: list[dict] = []
+    step_artifacts: list[dict] = []
+    last_screenshot: PendingScreenshot | None = None
+    error = ""
+    stopped = False
+    url = ""
+    title = ""
+    final_state: dict | None = None
+    try:
+        with ExitStack() as stack:
+            if browser is None:
+                browser = _launch_browser(stack.enter_context(sync_playwright()), settings)
+                stack.callback(_close_browser, browser)
+            page = _new_page(browser, settings, storage_state, har_path)
+            # Closing the context flushes its HAR and frees it when the browser is shared.
+            stack.callback(page.context.close)
+            _start_trace(page, trace_path)
+            for step_index in range(len(group.steps)):
+                if should_stop and should_stop():
+                    logs.append(f"[group {index}] stopped before step {step_index}")
+                    stopped = True
+                    break
+                ok, step_error, shot, _failure_shot = _run_step(
+                    page, group.steps, step_index, settings, logs, step_results, step_artifacts
+                )
+                if shot:
+                    last_screenshot = shot
+                if not ok:
+                    error = step_error
+                    break
+            url = page.url
+            title = page.title()
+            if capture_state and not error and not stopped:
+                final_state = page.context.storage_state()
+            _stop_trace(page, trace_path)
+    except Exception as exc:  # noqa: BLE001
+        error = str(exc)
+        logs.append(f"[error] {error}")
+
+    return {
+        "index": index,
+        "name": group.name,
+        "ok": not error and not stopped,
+        "error": error,
+        "stopped": stopped,
+        "url": url,
+        "title": title,
+        "step_results": step_results,
+        "logs": logs,
+        "screenshot": last_screenshot,
+        "storage_state": final_state,
+        "visited_urls": [*_goto_urls(group.steps), url],
+    }
+
+
+def _run_step_groups(
+    groups: list[BrowserStepGroup],
+    settings: Settings,
+    storage_state: dict | None = None,
+    capture_state: bool = False,
+    artifact_dir: Path | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    har_dir: Path | None = None,
+    browser=None,
+) -> list[dict]:
+    """Run step groups concurrently; results come back in plan order.
+
+    The task's admission slot covers its main browser only, so each group browser
+    running in parallel takes a free admission slot. Without any free slot the
+    groups run one at a time in new contexts of the task's own ``browser``, on the
+    calling thread, so no browser runs outside the admission limit.
+    """
+    if not groups:
+        return []
+    sampler = active_sampler()
+
+    def run(indexed: tuple[int, BrowserStepGroup], shared_browser=None) -> dict:
+        index, group = indexed
+        return _run_step_group(
+            index,
+            group,
+            settings,
+            storage_state,
+            capture_state,
+            artifact_dir / f"trace-group-{index}.zip" if artifact_dir else None,
+            should_stop,
+            har_dir / f"group-{index}.har" if har_dir else None,
+            shared_browser,
+        )
+
+    def run_sampled(indexed: tuple[int, BrowserStepGroup]) -> dict:
+        # Debug profiles cover the group threads as well as the orchestration thread.
+        with sample_thread(sampler):
+            return run(indexed)
+
+    admission = get_admission_controller()
+    reserved = admission.reserve_extra(min(len(groups), settings.playwright_max_parallel_groups))
+    if not reserved and browser is not None:
+        return [run(indexed, browser) for indexed in enumerate(groups)]
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max(1, reserved), thread_name_prefix="browser-group"
+        ) as pool:
+            return list(pool.map(run_sampled, enumerate(groups)))
+    finally:
+        admission.release_extra(reserved)
+
+
+def _collect_storage_states(page, plan: BrowserPlan, group_results: list[dict]):
+    """Pair each finished context's storage_state with the URLs it visited."""
+    states = [(page.context.storage_state(), [*_goto_urls(plan.steps), page.url])]
+    for group in group_results:
+        if group["storage_state"]:
+            states.append((group["storage_state"], group["visited_urls"]))
+    return states
+
+
+def _merge_group_results(
+    group_results: list[dict],
+    step_results: list[dict],
+    logs: list[str],
+) -> tuple[str, PendingScreenshot | None, list[dict]]:
+    """Fold group outcomes into the main run in plan order.
+
+    Returns the first group error, the screenshot of the last group that took one,
+    and a per-group summary for the result payload.
+    """
+    error = ""
+    screenshot: PendingScreenshot | None = None
+    summaries: list[dict] = []
+    for group in group_results:
+        step_results.extend({**item, "group": group["index"]} for item in group["step_results"])
+        logs.extend(group["logs"])
+        if group["screenshot"]:
+            screenshot = group["screenshot"]
+        if group["error"] and not error:
+            error = f"group {group['name'] or group['index']}: {group['error']}"
+        summary = {
+            "index": group["index"],
+            "name": group["name"],
+            "ok": group["ok"],
+            "url": group["url"],
+            "title": group["title"],
+        }
+        if group["error"]:
+            summary["error"] = group["error"]
+        if group["stopped"]:
+            summary["stopped"] = True
+        summary.update(screenshot_fields(group["screenshot"]))
+        summaries.append(summary)
+    return error, screenshot, summaries
+
+
+def _stop_requested(task_id: int) -> bool:
+    session_state = ACTIVE_SESSIONS.get(task_id)
+    return bool(session_state and session_state.stop_requested)
+
+
 def _run_playwright(state: BrowserState) -> BrowserState:
     plan = state["plan"]
     settings = Settings()
+    artifact_dir = Path(state["artifact_dir"]) if state["artifact_dir"] else None
+    trace_path = artifact_dir / TRACE_FILE if artifact_dir else None
+    har_dir = task_har_dir(state["prompt"], settings)
+    storage_state = load_storage_state(state["user_id"], _plan_urls(plan), settings)
     with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=not settings.playwright_headed, slow_mo=settings.playwright_slow_mo_ms
-        )
-        page = browser.new_page()
-        page.set_default_timeout(settings.playwright_default_timeout_ms)
-        page.set_default_timeout(settings.playwright_default_timeout_ms)
+        browser = _launch_browser(p, settings)
+        page = _new_page(browser, settings, storage_state, har_dir / MAIN_HAR if har_dir else None)
+        _start_trace(page, trace_path)
         step_results: list[dict] = []
         step_artifacts: list[dict] = []
-        last_screenshot: str | None = None
-        step_artifacts: list[dict] = []
+        group_results: list[dict] = []
+        group_summaries: list[dict] = []
+        last_screenshot: PendingScreenshot | None = None
         attempts = 0
         last_error = ""
         planner = GeminiClient()
@@ -173,11 +508,13 @@ def _run_playwright(state: BrowserState) -> BrowserState:
         while attempts < settings.planner_max_attempts:
             attempts += 1
             step_results.clear()
+            group_results = []
+            group_summaries = []
             last_error = ""
             logs.append(f"[attempt {attempts}] executing {len(plan.steps)} steps")
-            for step in plan.steps:
-                ok, error, shot, _failure_shot = _execute_step(
-                    page, step, settings, logs, step_results, step_artifacts
+            for index in range(len(plan.steps)):
+                ok, error, shot, _failure_shot = _run_step(
+                    page, plan.steps, index, settings, logs, step_results, step_artifacts
                 )
                 if shot:
                     last_screenshot = shot
@@ -185,6 +522,24 @@ def _run_playwright(state: BrowserState) -> BrowserState:
                     last_error = error
                     break
 
+            if not last_error and plan.groups:
+                logs.append(f"[attempt {attempts}] running {len(plan.groups)} groups in parallel")
+                group_results = _run_step_groups(
+                    plan.groups,
+                    settings,
+                    storage_state,
+                    storage_state_enabled(state["user_id"], settings),
+                    artifact_dir,
+                    har_dir=har_dir,
+                    browser=browser,
+                )
+                group_error, group_shot, group_summaries = _merge_group_results(
+                    group_results, step_results, logs
+                )
+                if group_shot:
+                    last_screenshot = group_shot
+                last_error = group_error
+
             if not last_error:
                 break
 
@@ -200,25 +555,32 @@ def _run_playwright(state: BrowserState) -> BrowserState:
                     dom_snapshot=dom_snapshot,
                 )
                 logs.append(f"[diagnosis] {diagnosis}")
-                plan = planner.replan_browser_task(
-                    prompt=state["prompt"],
-                    previous_plan=plan,
-                    error=last_error,
-                    page_url=page.url,
-                    page_title=page.title(),
-                    step_results=step_results,
-                    dom_snapshot=dom_snapshot,
+                plan = _prepare_plan(
+                    planner.replan_browser_task(
+                        prompt=state["prompt"],
+                        previous_plan=plan,
+                        error=last_error,
+                        page_url=page.url,
+                        page_title=page.title(),
+                        step_results=step_results,
+                        dom_snapshot=dom_snapshot,
+                    ),
+                    settings,
                 )
 
         title = page.title()
         result: dict = {
             "goal": plan.goal,
             "title": title,
+            "url": page.url,
             "steps": [step.model_dump() for step in plan.steps],
             "step_results": step_results,
             "attempts": attempts,
             "logs": logs,
         }
+        if plan.groups:
+            result["groups"] = [group.model_dump() for group in plan.groups]
+            result["group_results"] = group_summaries
         if last_error:
             result["error"] = last_error
         if diagnosis:
@@ -227,22 +589,39 @@ def _run_playwright(state: BrowserState) -> BrowserState:
             result["dom_snapshot"] = dom_snapshot
         if step_artifacts:
             result["step_artifacts"] = step_artifacts
-        if last_screenshot:
-            result["screenshot_base64"] = last_screenshot
+        result.update(screenshot_fields(last_screenshot))
 
-        browser.close()
+        if not last_error and storage_state_enabled(state["user_id"], settings):
+            save_storage_state(
+                state["user_id"], _collect_storage_states(page, plan, group_results), settings
+            )
+        _stop_trace(page, trace_path)
+        _close_browser(browser)
 
-    return {"prompt": state["prompt"], "plan": plan, "result": result, "feedback": ""}
+    return {
+        "prompt": state["prompt"],
+        "plan": plan,
+        "result": result,
+        "feedback": "",
+        "user_id": state["user_id"],
+        "artifact_dir": state["artifact_dir"],
+    }
 
 
 def _summarize(state: BrowserState) -> BrowserState:
     client = GeminiClient()
-    feedback = client.summarize_execution(state["prompt"], state["result"])
+    # The encoded screenshot is of no use in the prompt and can dwarf everything else.
+    summary_input = {
+        key: value for key, value in state["result"].items() if not key.startswith("screenshot_")
+    }
+    feedback = client.summarize_execution(state["prompt"], summary_input)
     return {
         "prompt": state["prompt"],
         "plan": state["plan"],
         "result": state["result"],
         "feedback": feedback,
+        "user_id": state["user_id"],
+        "artifact_dir": state["artifact_dir"],
     }
 
 
@@ -259,35 +638,90 @@ def build_browser_graph() -> StateGraph:
     return graph
 
 
-def run_browser_graph(prompt: str) -> dict:
+def run_browser_graph(
+    prompt: str, user_id: int | None = None, artifact_dir: Path | None = None
+) -> dict:
     graph = build_browser_graph().compile()
-    result = graph.invoke(
-        {"prompt": prompt, "plan": BrowserPlan(steps=[]), "result": {}, "feedback": ""}
-    )
+    initial_state: BrowserState = {
+        "prompt": prompt,
+        "plan": BrowserPlan(steps=[]),
+        "result": {},
+        "feedback": "",
+        "user_id": user_id,
+        "artifact_dir": str(artifact_dir) if artifact_dir else None,
+    }
+    if artifact_dir is None:
+        result = graph.invoke(initial_state)
+    else:
+        interval_ms = Settings().debug_profile_interval_ms
+        with profile_current_thread(artifact_dir / PROFILE_FILE, interval_ms):
+            result = graph.invoke(initial_state)
     response = result["result"]
     if result["feedback"]:
         response["feedback"] = result["feedback"]
     return response
 
 
-def run_browser_graph_stream(prompt: str, task_id: int):
+def run_monitor_check(
+    prompt: str, plan: BrowserPlan | None, user_id: int | None = None
+) -> tuple[BrowserPlan, dict]:
+    """Execute a monitor's plan without the summarize step.
+
+    A cached plan skips planning entirely; if it no longer works the usual
+    diagnose/replan attempts apply and the plan that finally ran is returned.
+    """
     settings = Settings()
+    if plan is None:
+        plan = _prepare_plan(GeminiClient().plan_browser_task(prompt), settings)
+    state = _run_playwright(
+        {
+            "prompt": prompt,
+            "plan": plan,
+            "result": {},
+            "feedback": "",
+            "user_id": user_id,
+            "artifact_dir": None,
+        }
+    )
+    return state["plan"], state["result"]
+
+
+def run_browser_graph_stream(
+    prompt: str,
+    task_id: int,
+    user_id: int | None = None,
+    artifact_dir: Path | None = None,
+):
+    if artifact_dir is None:
+        yield from _stream_browser_task(prompt, task_id, user_id, None)
+        return
+    interval_ms = Settings().debug_profile_interval_ms
+    with profile_current_thread(artifact_dir / PROFILE_FILE, interval_ms):
+        yield from _stream_browser_task(prompt, task_id, user_id, artifact_dir)
+
+
+def _stream_browser_task(
+    prompt: str, task_id: int, user_id: int | None, artifact_dir: Path | None
+):
+    settings = Settings()
+    trace_path = artifact_dir / TRACE_FILE if artifact_dir else None
     planner = GeminiClient()
-    plan = planner.plan_browser_task(prompt)
+    plan = _prepare_plan(planner.plan_browser_task(prompt), settings)
     attempt = 1
 
     plan_summary = planner.summarize_plan(prompt, plan)
     yield {"event": "plan", "data": {"summary": plan_summary}}
 
+    har_dir = task_har_dir(prompt, settings)
+    storage_state = load_storage_state(user_id, _plan_urls(plan), settings)
     with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=not settings.playwright_headed, slow_mo=settings.playwright_slow_mo_ms
-        )
-        page = browser.new_page()
+        browser = _launch_browser(p, settings)
+        page = _new_page(browser, settings, storage_state, har_dir / MAIN_HAR if har_dir else None)
+        _start_trace(page, trace_path)
 
         step_results: list[dict] = []
         step_artifacts: list[dict] = []
-        last_screenshot: str | None = None
+        last_screenshot: PendingScreenshot | None = None
         last_error = ""
         diagnosis = ""
         dom_snapshot = ""
@@ -299,86 +733,133 @@ def run_browser_graph_stream(prompt: str, task_id: int):
             plan=plan,
             step_index=0,
             step_results=step_results,
-            last_screenshot=last_screenshot,
+            last_screenshot=None,
             last_error=last_error,
             logs=[],
             dom_snapshot=dom_snapshot,
             stop_requested=False,
         )
 
-        while attempt <= settings.planner_max_attempts:
-            if ACTIVE_SESSIONS.get(task_id) and ACTIVE_SESSIONS[task_id].stop_requested:
+        while True:
+            if _stop_requested(task_id):
                 yield {"event": "stopped", "data": {"reason": "user_requested"}}
                 break
             yield {"event": "attempt_start", "data": {"attempt": attempt}}
+            last_error = ""
+            failed_index: int | None = None
+            failure_shot: PendingScreenshot | None = None
+            group_results: list[dict] = []
+            group_summaries: list[dict] = []
+            stopped = False
             for idx, step in enumerate(plan.steps):
-                if ACTIVE_SESSIONS.get(task_id) and ACTIVE_SESSIONS[task_id].stop_requested:
-                    yield {"event": "stopped", "data": {"reason": "user_requested"}}
+                if _stop_requested(task_id):
+                    stopped = True
                     break
                 yield {"event": "step_start", "data": {"index": idx, "step": step.model_dump()}}
-                ok, error, shot, failure_shot = _execute_step(
-                    page, step, settings, [], step_results, step_artifacts
+                ok, error, shot, failure_shot = _run_step(
+                    page, plan.steps, idx, settings, [], step_results, step_artifacts
                 )
                 if shot:
                     last_screenshot = shot
                 if not ok:
                     last_error = error
-                    dom_snapshot = _capture_dom_snapshot(page, settings)
-                    diagnosis = planner.diagnose_failure(
-                        prompt=prompt,
-                        previous_plan=plan,
-                        error=last_error,
-                        page_url=page.url,
-                        page_title=page.title(),
-                        step_results=step_results,
-                        dom_snapshot=dom_snapshot,
-                    )
-                    yield {
-                        "event": "step_error",
-                        "data": {
-                            "index": idx,
-                            "error": last_error,
-                            "diagnosis": diagnosis,
-                            "dom_snapshot": dom_snapshot,
-                            "step_results": step_results,
-                            "failure_screenshot_base64": failure_shot,
-                        },
-                    }
-
-                    if attempt < settings.planner_max_attempts:
-                        plan = planner.replan_browser_task(
-                            prompt=prompt,
-                            previous_plan=plan,
-                            error=last_error,
-                            page_url=page.url,
-                            page_title=page.title(),
-                            step_results=step_results,
-                            dom_snapshot=dom_snapshot,
-                        )
-                        attempt += 1
-                        yield {"event": "replan", "data": plan.model_dump()}
-                        break
-                else:
-                    yield {"event": "step_result", "data": {"index": idx}}
-            else:
-                # completed all steps
+                    failed_index = idx
+                    break
+                yield {"event": "step_result", "data": {"index": idx}}
+
+            if not stopped and not last_error and plan.groups:
+                yield {"event": "groups_start", "data": {"count": len(plan.groups)}}
+                group_results = _run_step_groups(
+                    plan.groups,
+                    settings,
+                    storage_state,
+                    storage_state_enabled(user_id, settings),
+                    artifact_dir,
+                    lambda: _stop_requested(task_id),
+                    har_dir,
+                    browser,
+                )
+                group_error, group_shot, group_summaries = _merge_group_results(
+                    group_results, step_results, []
+                )
+                for summary in group_summaries:
+                    yield {"event": "group_result", "data": summary}
+                if group_shot:
+                    last_screenshot = group_shot
+                last_error = group_error
+                stopped = any(group["stopped"] for group in group_results)
+
+            if stopped:
+                yield {"event": "stopped", "data": {"reason": "user_requested"}}
+                break
+
+            if not last_error:
                 title = page.title()
                 result = {
                     "goal": plan.goal,
                     "title": title,
                 }
-                if last_screenshot:
-                    result["screenshot_base64"] = last_screenshot
+                extracted = [
+                    item
+                    for item in step_results
+                    if item.get("ok") and item["action"] in ("extract_text", "extract_structured")
+                ]
+                if extracted:
+                    result["extracted"] = extracted
+                if group_summaries:
+                    result["group_results"] = group_summaries
                 if plan_summary:
                     result["plan_summary"] = plan_summary
                 feedback = planner.summarize_execution(prompt, result)
                 if feedback:
                     result["feedback"] = feedback
+                # Added after summarizing so the encoded image stays out of the prompt.
+                result.update(screenshot_fields(last_screenshot))
+                if storage_state_enabled(user_id, settings):
+                    save_storage_state(
+                        user_id, _collect_storage_states(page, plan, group_results), settings
+                    )
                 yield {"event": "complete", "data": result}
                 break
 
-            if attempt > settings.planner_max_attempts:
+            dom_snapshot = _capture_dom_snapshot(page, settings)
+            diagnosis = planner.diagnose_failure(
+                prompt=prompt,
+                previous_plan=plan,
+                error=last_error,
+                page_url=page.url,
+                page_title=page.title(),
+                step_results=step_results,
+                dom_snapshot=dom_snapshot,
+            )
+            yield {
+                "event": "step_error",
+                "data": {
+                    "index": failed_index,
+                    "error": last_error,
+                    "diagnosis": diagnosis,
+                    "dom_snapshot": dom_snapshot,
+                    "step_results": step_results,
+                    **screenshot_fields(failure_shot, prefix="failure_screenshot"),
+                },
+            }
+
+            if attempt >= settings.planner_max_attempts:
                 break
+            plan = _prepare_plan(
+                planner.replan_browser_task(
+                    prompt=prompt,
+                    previous_plan=plan,
+                    error=last_error,
+                    page_url=page.url,
+                    page_title=page.title(),
+                    step_results=step_results,
+                    dom_snapshot=dom_snapshot,
+                ),
+                settings,
+            )
+            attempt += 1
+            yield {"event": "replan", "data": plan.model_dump()}
 
         if last_error:
             yield {
@@ -390,5 +871,6 @@ def run_browser_graph_stream(prompt: str, task_id: int):
                 },
             }
 
-        browser.close()
+        _stop_trace(page, trace_path)
+        _close_browser(browser)
         ACTIVE_SESSIONS.pop(task_id, None)
@@ -0,0 +1,263 @@
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from app.core.config import Settings
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class AdmissionTicket:
+    user_id: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+    admitted_at: float | None = None
+    released: bool = False
+
+    @property
+    def admitted(self) -> bool:
+        return self.admitted_at is not None
+
+
+def _read_int(path: str) -> int | None:
+    try:
+        with open(path) as handle:
+            value = handle.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def _cgroup_memory_headroom() -> int | None:
+    """Bytes the process's memory cgroup (v2, then v1) can still grow by, if limited."""
+    for limit_path, usage_path in (
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        (
+            "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+            "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+        ),
+    ):
+        limit = _read_int(limit_path)
+        # v2 writes "max" when unlimited; v1 reports a near-2**63 sentinel.
+        if limit is None or limit >= 2**60:
+            continue
+        return max(0, limit - (_read_int(usage_path) or 0))
+    return None
+
+
+def available_memory() -> int | None:
+    """Memory new browsers can use: MemAvailable, capped by the cgroup limit if any.
+
+    MemAvailable counts reclaimable page cache, which MemFree leaves out even though
+    it is given back on demand.
+    """
+    available = None
+    try:
+        with open("/proc/meminfo") as handle:
+            for line in handle:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError):
+        pass
+    headroom = _cgroup_memory_headroom()
+    if headroom is not None:
+        available = headroom if available is None else min(available, headroom)
+    return available
+
+
+def default_browser_limit(settings: Settings) -> int:
+    """Browsers this host can run at once: one per core, capped by available memory."""
+    if settings.admission_max_browsers > 0:
+        return settings.admission_max_browsers
+    cores = os.cpu_count() or 1
+    available = available_memory()
+    if available is None:
+        return cores
+    by_memory = available // (settings.admission_browser_memory_mb * 1024 * 1024)
+    return max(1, min(cores, by_memory))
+
+
+class AdmissionController:
+    """Bounded FIFO queue in front of browser launches.
+
+    A ticket is admitted once a global slot is free and its user is under the
+    per-user concurrency limit; later tickets from other users may overtake a user
+    that is at their limit. Submissions beyond the per-user rate or the queue size
+    are rejected with a Retry-After estimate. A running task can borrow free slots
+    for extra browsers, such as parallel step groups, with ``reserve_extra``.
+    """
+
+    def __init__(
+        self,
+        max_running: int,
+        per_user_concurrency: int,
+        per_user_per_minute: int,
+        queue_size: int,
+    ) -> None:
+        self.max_running = max_running
+        self.per_user_concurrency = per_user_concurrency
+        self.per_user_per_minute = per_user_per_minute
+        self.queue_size = queue_size
+        self._cond = threading.Condition()
+        self._queue: list[AdmissionTicket] = []
+        self._running_total = 0
+        self._running: dict[int, int] = defaultdict(int)
+        self._extra = 0
+        self._recent: dict[int, deque[float]] = defaultdict(deque)
+        self._waits: deque[float] = deque(maxlen=200)
+        self._durations: deque[float] = deque(maxlen=200)
+        self._admitted_total = 0
+        self._rejected_total = 0
+
+    def submit(self, user_id: int) -> AdmissionTicket:
+        now = time.monotonic()
+        with self._cond:
+            recent = self._recent[user_id]
+            while recent and now - recent[0] >= 60:
+                recent.popleft()
+            if self.per_user_per_minute and len(recent) >= self.per_user_per_minute:
+                self._rejected_total += 1
+                raise AdmissionRejected("rate_limited", max(1, math.ceil(60 - (now - recent[0]))))
+            if len(self._queue) >= self.queue_size:
+                self._rejected_total += 1
+                raise AdmissionRejected("queue_full", self._estimate_wait())
+            recent.append(now)
+            ticket = AdmissionTicket(user_id=user_id, enqueued_at=now)
+            self._queue.append(ticket)
+            self._admit_waiting()
+            return ticket
+
+    def position(self, ticket: AdmissionTicket) -> int:
+        with self._cond:
+            try:
+                return self._queue.index(ticket) + 1
+            except ValueError:
+                return 0
+
+    def wait(self, ticket: AdmissionTicket, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: ticket.admitted, timeout)
+
+    def wait_with_updates(
+        self, ticket: AdmissionTicket, timeout: float, interval: float = 2.0
+    ) -> Iterator[int]:
+        """Yield the ticket's queue position until it is admitted or ``timeout`` passes."""
+        deadline = time.monotonic() + timeout
+        last_position = None
+        while not ticket.admitted:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            position = self.position(ticket)
+            if position and position != last_position:
+                last_position = position
+                yield position
+            self.wait(ticket, min(interval, remaining))
+
+    def release(self, ticket: AdmissionTicket) -> None:
+        """Free the ticket's slot, or drop it from the queue if it was never admitted."""
+        with self._cond:
+            if ticket.released:
+                return
+            ticket.released = True
+            if not ticket.admitted:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                return
+            self._running_total -= 1
+            self._running[ticket.user_id] -= 1
+            if self._running[ticket.user_id] <= 0:
+                del self._running[ticket.user_id]
+            self._durations.append(time.monotonic() - ticket.admitted_at)
+            self._admit_waiting()
+
+    def reserve_extra(self, count: int) -> int:
+        """Take up to ``count`` free slots without waiting; returns how many were taken.
+
+        Queued tickets are admitted whenever a slot frees up, so a slot that is free
+        here is one no waiting ticket can use right now.
+        """
+        with self._cond:
+            granted = max(0, min(count, self.max_running - self._running_total))
+            self._running_total += granted
+            self._extra += granted
+            return granted
+
+    def release_extra(self, count: int) -> None:
+        if count <= 0:
+            return
+        with self._cond:
+            self._running_total -= count
+            self._extra -= count
+            self._admit_waiting()
+
+    def metrics(self) -> dict:
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "max_running": self.max_running,
+                "running": self._running_total,
+                "extra_browsers": self._extra,
+                "queue_depth": len(self._queue),
+                "queue_size": self.queue_size,
+                "admitted_total": self._admitted_total,
+                "rejected_total": self._rejected_total,
+                "wait_seconds_avg": sum(waits) / len(waits) if waits else 0.0,
+                "wait_seconds_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                "oldest_wait_seconds": (
+                    time.monotonic() - self._queue[0].enqueued_at if self._queue else 0.0
+                ),
+            }
+
+    def _admit_waiting(self) -> None:
+        # Caller holds the lock.
+        admitted = False
+        for ticket in list(self._queue):
+            if self._running_total >= self.max_running:
+                break
+            if self._running[ticket.user_id] >= self.per_user_concurrency:
+                continue
+            self._queue.remove(ticket)
+            ticket.admitted_at = time.monotonic()
+            self._running_total += 1
+            self._running[ticket.user_id] += 1
+            self._admitted_total += 1
+            self._waits.append(ticket.admitted_at - ticket.enqueued_at)
+            admitted = True
+        if admitted:
+            self._cond.notify_all()
+
+    def _estimate_wait(self) -> int:
+        # Caller holds the lock.
+        if not self._durations:
+            return 30
+        average = sum(self._durations) / len(self._durations)
+        return max(1, math.ceil(average * len(self._queue) / self.max_running))
+
+
+_CONTROLLER: AdmissionController | None = None
+_CONTROLLER_LOCK = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    global _CONTROLLER
+    with _CONTROLLER_LOCK:
+        if _CONTROLLER is None:
+            settings = Settings()
+            _CONTROLLER = AdmissionController(
+                max_running=default_browser_limit(settings),
+                per_user_concurrency=settings.admission_per_user_concurrency,
+                per_user_per_minute=settings.admission_per_user_per_minute,
+                queue_size=settings.admission_queue_size,
+            )
+        return _CONTROLLER
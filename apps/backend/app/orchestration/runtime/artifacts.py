@@ -1,4 +1,31 @@
+import random
+from pathlib import Path
+
+from app.core.config import Settings
+
+TRACE_FILE = "trace.zip"
+PROFILE_FILE = "profile.collapsed"
+
+
 def truncate_text(text: str, limit: int = 8000) -> str:
     if len(text) <= limit:
         return text
     return text[:limit] + "\n...[truncated]..."
+
+
+def should_capture_debug(requested: bool, settings: Settings) -> bool:
+    """Debug capture runs when the caller asks for it or the task is sampled."""
+    if requested:
+        return True
+    return settings.debug_sample_rate > 0 and random.random() < settings.debug_sample_rate
+
+
+def task_artifact_dir(settings: Settings, task_id: int) -> Path:
+    return Path(settings.debug_artifacts_dir).resolve() / str(task_id)
+
+
+def list_task_artifacts(settings: Settings, task_id: int) -> list[str]:
+    directory = task_artifact_dir(settings, task_id)
+    if not directory.is_dir():
+        return []
+    return sorted(path.name for path in directory.iterdir() if path.is_file())
@@ -0,0 +1,118 @@
+import threading
+from collections import deque
+from collections.abc import Iterator
+
+from app.core.concurrency import new_waker
+from app.core.config import Settings
+
+
+class _Channel:
+    def __init__(self, history_size: int) -> None:
+        self.history: deque[dict] = deque(maxlen=history_size)
+        self.subscribers: set["Subscription"] = set()
+        self.closed = False
+
+
+class Subscription:
+    """One SSE listener. Events are pushed into a bounded buffer, oldest dropped first."""
+
+    def __init__(self, task_id: int, channel: _Channel, buffer_size: int) -> None:
+        self.task_id = task_id
+        self.channel = channel
+        self.pending: deque[dict] = deque(maxlen=buffer_size)
+        self.waker = new_waker()
+
+    def iter_events(self, heartbeat_s: float) -> Iterator[dict | None]:
+        """Yield events as they arrive and ``None`` after ``heartbeat_s`` of silence.
+
+        Ends once the task's channel is closed and everything buffered was delivered.
+        """
+        while True:
+            self.waker.clear()
+            while self.pending:
+                yield self.pending.popleft()
+            if self.channel.closed:
+                return
+            if not self.waker.wait(heartbeat_s):
+                yield None
+
+
+class TaskEventBus:
+    """In-process fan-out of task events from worker threads to any number of streams.
+
+    Each task keeps a short replay history so late subscribers (a reloaded page, a
+    second tab) see the events they missed; both history and per-subscriber buffers
+    are bounded so memory stays flat regardless of how many streams are open.
+    """
+
+    def __init__(self, history_size: int, buffer_size: int) -> None:
+        self.history_size = history_size
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._channels: dict[int, _Channel] = {}
+
+    def open(self, task_id: int) -> None:
+        with self._lock:
+            self._channels.setdefault(task_id, _Channel(self.history_size))
+
+    def is_open(self, task_id: int) -> bool:
+        with self._lock:
+            return task_id in self._channels
+
+    def publish(self, task_id: int, event: dict) -> None:
+        with self._lock:
+            channel = self._channels.get(task_id)
+            if channel is None:
+                return
+            channel.history.append(event)
+            subscribers = list(channel.subscribers)
+            for subscription in subscribers:
+                subscription.pending.append(event)
+        for subscription in subscribers:
+            subscription.waker.notify()
+
+    def close(self, task_id: int) -> None:
+        with self._lock:
+            channel = self._channels.pop(task_id, None)
+            if channel is None:
+                return
+            channel.closed = True
+            subscribers = list(channel.subscribers)
+        for subscription in subscribers:
+            subscription.waker.notify()
+
+    def subscribe(self, task_id: int) -> Subscription | None:
+        """Attach to a running task, replaying its history; None if it is not running."""
+        with self._lock:
+            channel = self._channels.get(task_id)
+            if channel is None:
+                return None
+            subscription = Subscription(task_id, channel, self.buffer_size)
+            subscription.pending.extend(channel.history)
+            channel.subscribers.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscription.channel.subscribers.discard(subscription)
+        subscription.waker.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open_tasks": len(self._channels),
+                "subscribers": sum(len(c.subscribers) for c in self._channels.values()),
+            }
+
+
+_BUS: TaskEventBus | None = None
+_BUS_LOCK = threading.Lock()
+
+
+def get_event_bus() -> TaskEventBus:
+    global _BUS
+    with _BUS_LOCK:
+        if _BUS is None:
+            settings = Settings()
+            _BUS = TaskEventBus(settings.event_history_size, settings.event_subscriber_buffer)
+        return _BUS
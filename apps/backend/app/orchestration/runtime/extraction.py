@@ -0,0 +1,72 @@
+EXTRACT_STRUCTURED_JS = """
+async ({ container, fields, limit, maxScrolls, scrollWaitMs }) => {
+  const rows = [];
+  const seen = new Set();
+  const readField = (root, field) => {
+    const target = field.selector ? root.querySelector(field.selector) : root;
+    if (!target) {
+      return null;
+    }
+    if (field.attribute) {
+      return target.getAttribute(field.attribute);
+    }
+    return (target.innerText || target.textContent || "").trim();
+  };
+  const collect = () => {
+    for (const el of document.querySelectorAll(container)) {
+      if (rows.length >= limit) {
+        return;
+      }
+      if (seen.has(el)) {
+        continue;
+      }
+      seen.add(el);
+      const row = {};
+      for (const field of fields) {
+        row[field.name] = readField(el, field);
+      }
+      rows.push(row);
+    }
+  };
+
+  collect();
+  let scrolls = 0;
+  while (rows.length < limit && scrolls < maxScrolls) {
+    const before = seen.size;
+    window.scrollBy(0, window.innerHeight);
+    await new Promise((resolve) => setTimeout(resolve, scrollWaitMs));
+    scrolls += 1;
+    collect();
+    if (seen.size === before) {
+      break;
+    }
+  }
+  return { rows, scrolls };
+}
+"""
+
+
+def extract_structured(
+    page,
+    container: str,
+    fields: list[dict],
+    limit: int,
+    max_scrolls: int = 0,
+    scroll_wait_ms: int = 500,
+) -> dict:
+    """Extract one record per container match in a single page.evaluate round trip.
+
+    Each field is ``{"name", "selector", "attribute"}``; the selector is relative to
+    the container (or the container itself when empty) and the attribute defaults to
+    the element's text. Scrolling stops early once a scroll yields no new rows.
+    """
+    return page.evaluate(
+        EXTRACT_STRUCTURED_JS,
+        {
+            "container": container,
+            "fields": fields,
+            "limit": limit,
+            "maxScrolls": max_scrolls,
+            "scrollWaitMs": scroll_wait_ms,
+        },
+    )
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from app.core.config import Settings
+
+MAIN_HAR = "main.har"
+CACHEABLE_RESOURCE_TYPES = {"script", "stylesheet", "image", "font"}
+# Requests that carry these may get a per-user response, which must not be shared.
+_CREDENTIAL_HEADERS = ("authorization", "cookie", "proxy-authorization")
+# Hop-by-hop and encoding headers that no longer describe the stored body.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+_MAX_AGE_RE = re.compile(r"(?:s-maxage|max-age)\s*=\s*(\d+)")
+
+
+def _freshness_seconds(headers: dict[str, str]) -> int:
+    """Seconds a response may be reused for according to Cache-Control/Expires."""
+    cache_control = headers.get("cache-control", "").lower()
+    if any(token in cache_control for token in ("no-store", "no-cache", "private")):
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if match:
+        return int(match.group(1))
+    expires = headers.get("expires")
+    if expires:
+        try:
+            return max(0, int(parsedate_to_datetime(expires).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+def _shareable(headers: dict[str, str]) -> bool:
+    """Whether a response is the same for every client, given entries are keyed by URL."""
+    if "set-cookie" in headers:
+        return False
+    vary = {token.strip() for token in headers.get("vary", "").lower().split(",")}
+    # Bodies are stored decoded, so varying on Accept-Encoding is harmless.
+    return vary <= {"", "accept-encoding"}
+
+
+class HttpCache:
+    """Disk cache for static subresources shared by every browser context in the process.
+
+    Entries are a body file plus a JSON metadata file keyed by the request URL hash.
+    File mtimes track recency so eviction drops the least recently used entries once
+    the cache grows past ``max_bytes``. Credentialed requests and responses that
+    set cookies or vary per client are never stored, so entries are safe to share
+    across users.
+    """
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = sum(path.stat().st_size for path in self.root.glob("*.body"))
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / f"{key}.body", self.root / f"{key}.json"
+
+    def get(self, url: str) -> tuple[dict, bytes] | None:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta["expires_at"] <= time.time():
+                return None
+            body = body_path.read_bytes()
+            # The entry may be evicted between the read and the touch; treat it as a miss.
+            os.utime(body_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return meta, body
+
+    def put(self, url: str, status: int, headers: dict[str, str], body: bytes) -> None:
+        ttl = _freshness_seconds(headers)
+        if status != 200 or ttl <= 0 or not _shareable(headers):
+            return
+        if len(body) > self.max_bytes // 10:
+            return
+        body_path, meta_path = self._paths(url)
+        meta = {
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "expires_at": time.time() + ttl,
+        }
+        with self._lock:
+            previous = body_path.stat().st_size if body_path.exists() else 0
+            # Write-then-rename so concurrent readers never see a partial entry.
+            tmp_body = body_path.with_suffix(".body.tmp")
+            tmp_body.write_bytes(body)
+            os.replace(tmp_body, body_path)
+            tmp_meta = meta_path.with_suffix(".json.tmp")
+            tmp_meta.write_text(json.dumps(meta))
+            os.replace(tmp_meta, meta_path)
+            self._size += len(body) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self.root.glob("*.body"), key=lambda path: path.stat().st_mtime)
+        target = int(self.max_bytes * 0.9)
+        for body_path in entries:
+            if self._size <= target:
+                break
+            try:
+                size = body_path.stat().st_size
+                body_path.unlink()
+                body_path.with_suffix(".json").unlink(missing_ok=True)
+            except OSError:
+                continue
+            self._size -= size
+
+    def handle_route(self, route) -> None:
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+            route.fallback()
+            return
+        # all_headers() includes the Cookie header, which ``headers`` leaves out.
+        if any(name in request.all_headers() for name in _CREDENTIAL_HEADERS):
+            route.fallback()
+            return
+        cached = self.get(request.url)
+        if cached:
+            meta, body = cached
+            route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+            return
+        try:
+            response = route.fetch()
+        except Exception:  # noqa: BLE001
+            route.fallback()
+            return
+        try:
+            self.put(request.url, response.status, response.headers, response.body())
+        except OSError:
+            pass
+        route.fulfill(response=response)
+
+
+_CACHE: HttpCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_http_cache(settings: Settings) -> HttpCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = HttpCache(settings.http_cache_dir, settings.http_cache_max_bytes)
+        return _CACHE
+
+
+def task_har_dir(prompt: str, settings: Settings) -> Path | None:
+    """Directory for one task's HAR files, keyed by its whitespace-normalized prompt.
+
+    Every browser context of the task records to and replays from its own file in
+    it, so group contexts never share a HAR and a replay finds the recording of the
+    same task.
+    """
+    if settings.http_har_mode == "off":
+        return None
+    key = hashlib.sha256(" ".join(prompt.split()).encode("utf-8")).hexdigest()[:16]
+    return Path(settings.http_har_dir) / key
+
+
+def _publish_har(partial: Path, har_path: Path) -> None:
+    try:
+        os.replace(partial, har_path)
+    except OSError:
+        pass
+
+
+def install_network_layer(context, settings: Settings, har_path: Path | None = None) -> None:
+    """Attach the shared disk cache and/or HAR record/replay to a new browser context.
+
+    In ``replay`` mode requests are served only from ``har_path`` so runs are fully
+    offline; ``record`` writes it when the context closes.
+    """
+    if har_path is not None and settings.http_har_mode == "replay":
+        context.route_from_har(har_path, not_found="abort")
+        return
+    if settings.http_cache_enabled:
+        context.route("**/*", get_http_cache(settings).handle_route)
+    if har_path is not None and settings.http_har_mode == "record":
+        har_path.parent.mkdir(parents=True, exist_ok=True)
+        # Record to a private file and move it into place once the context has closed,
+        # so concurrent runs of the same task never write to one HAR at the same time.
+        partial = har_path.with_name(f".{har_path.name}.{uuid.uuid4().hex}")
+        context.route_from_har(partial, update=True, update_content="embed")
+        context.on("close", lambda _context: _publish_har(partial, har_path))
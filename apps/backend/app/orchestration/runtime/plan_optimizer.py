@@ -0,0 +1,141 @@
+from app.llm.gemini_client import BrowserPlan, BrowserStep
+
+# Actions that may change the DOM (navigate, re-render, reveal or lazy-load content).
+# Steps after these may depend on what they did, so selector pre-checks never look
+# past them.
+SEGMENT_BOUNDARY_ACTIONS = {"goto", "click", "type", "scroll", "wait_for", "extract_structured"}
+PRECHECKED_ACTIONS = {"click", "type", "extract_text"}
+
+MISSING_SELECTORS_JS = """
+async ({ selectors, graceMs }) => {
+  // Playwright's CSS engine also matches inside open shadow roots, so search those too.
+  const scopes = () => {
+    const found = [document];
+    for (let i = 0; i < found.length; i++) {
+      for (const element of found[i].querySelectorAll("*")) {
+        if (element.shadowRoot) found.push(element.shadowRoot);
+      }
+    }
+    return found;
+  };
+  // A combinator can cross a shadow boundary in Playwright but not in querySelector.
+  const combined = (selector) =>
+    /[\\s>+~]/.test(selector.replace(/\\[[^\\]]*\\]|"[^"]*"|'[^']*'|\\([^)]*\\)/g, ""));
+  // Playwright-only syntax (text=, :has-text, >>) is not CSS; treat it as unknown.
+  const missing = (selector, roots) => {
+    try {
+      if (roots.some((root) => root.querySelector(selector))) return false;
+      return roots.length === 1 || !combined(selector);
+    } catch (error) {
+      return false;
+    }
+  };
+  const check = (pending) => {
+    const light = pending.filter((selector) => missing(selector, [document]));
+    if (!light.length) return light;
+    const roots = scopes();
+    return roots.length === 1 ? light : light.filter((selector) => missing(selector, roots));
+  };
+  const deadline = performance.now() + graceMs;
+  let absent = check(selectors);
+  while (absent.length && performance.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, 100));
+    absent = check(absent);
+  }
+  return absent;
+}
+"""
+
+
+def _is_fixed_wait(step: BrowserStep) -> bool:
+    return step.action == "wait_for" and not step.selector
+
+
+def optimize_steps(steps: list[BrowserStep], default_wait_ms: int) -> list[BrowserStep]:
+    """Drop steps that cannot change the outcome of a plan.
+
+    - fixed sleeps right before a selector wait (the selector wait already blocks)
+    - repeated waits for the same selector
+    - consecutive fixed sleeps, merged into one sleep of the same total length
+    - a goto immediately superseded by another goto
+
+    A fixed sleep at the end of the plan is kept: the final URL, title and storage
+    state are read right after the last step, and a redirect or cookie write may
+    still be landing.
+    """
+    optimized: list[BrowserStep] = []
+    for step in steps:
+        previous = optimized[-1] if optimized else None
+        if step.action == "wait_for" and step.selector:
+            while optimized and _is_fixed_wait(optimized[-1]):
+                optimized.pop()
+            if (
+                optimized
+                and optimized[-1].action == "wait_for"
+                and optimized[-1].selector == step.selector
+            ):
+                continue
+        elif _is_fixed_wait(step) and previous is not None and _is_fixed_wait(previous):
+            merged = (previous.wait_ms or default_wait_ms) + (step.wait_ms or default_wait_ms)
+            optimized[-1] = previous.model_copy(update={"wait_ms": merged})
+            continue
+        elif step.action == "goto":
+            index = len(optimized)
+            while index and _is_fixed_wait(optimized[index - 1]):
+                index -= 1
+            if index and optimized[index - 1].action == "goto":
+                del optimized[index - 1 :]
+        optimized.append(step)
+    return optimized
+
+
+def optimize_plan(plan: BrowserPlan, default_wait_ms: int) -> BrowserPlan:
+    return plan.model_copy(
+        update={
+            "steps": optimize_steps(plan.steps, default_wait_ms),
+            "groups": [
+                group.model_copy(update={"steps": optimize_steps(group.steps, default_wait_ms)})
+                for group in plan.groups
+            ],
+        }
+    )
+
+
+def upcoming_selectors(steps: list[BrowserStep], start: int) -> list[str]:
+    """Selectors the steps from ``start`` will need on the page as it is now.
+
+    Returns nothing unless ``start`` begins a segment (plan start or right after a
+    boundary action), so a segment is validated once, not at every step. A boundary
+    step's own selector belongs to the segment it ends: it acts on the current page.
+    """
+    if start > 0 and steps[start - 1].action not in SEGMENT_BOUNDARY_ACTIONS:
+        return []
+    selectors: list[str] = []
+    for step in steps[start:]:
+        if step.action in PRECHECKED_ACTIONS and step.selector and step.selector not in selectors:
+            selectors.append(step.selector)
+        if step.action in SEGMENT_BOUNDARY_ACTIONS:
+            break
+    return selectors
+
+
+def find_missing_selectors(page, selectors: list[str], grace_ms: int) -> list[str]:
+    """Return the selectors that match nothing, checked in one evaluate per frame.
+
+    The main frame gets ``grace_ms`` to finish rendering; anything still missing is
+    looked up in child frames. If a frame cannot be inspected the result is treated
+    as inconclusive and nothing is reported missing.
+    """
+    if not selectors:
+        return []
+    missing = page.main_frame.evaluate(
+        MISSING_SELECTORS_JS, {"selectors": selectors, "graceMs": grace_ms}
+    )
+    for frame in page.frames[1:]:
+        if not missing:
+            break
+        try:
+            missing = frame.evaluate(MISSING_SELECTORS_JS, {"selectors": missing, "graceMs": 0})
+        except Exception:  # noqa: BLE001
+            return []
+    return missing
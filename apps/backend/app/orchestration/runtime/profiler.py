@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+_ACTIVE = threading.local()
+
+
+class ThreadSampler:
+    """Samples the Python stacks of a set of threads at a fixed interval from a helper thread.
+
+    Output is collapsed-stack text (``thread;frame;frame count``), which flamegraph.pl,
+    speedscope and most profile viewers load directly. Each stack is rooted at its
+    thread's name so worker threads show up next to the thread that started them.
+    """
+
+    def __init__(self, thread_id: int, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self.samples: Counter[str] = Counter()
+        self._threads = {thread_id}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="task-profiler", daemon=True)
+
+    def add_thread(self, thread_id: int) -> None:
+        with self._lock:
+            self._threads.add(thread_id)
+
+    def remove_thread(self, thread_id: int) -> None:
+        with self._lock:
+            self._threads.discard(thread_id)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            with self._lock:
+                thread_ids = list(self._threads)
+            frames = sys._current_frames()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                stack: list[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                        f"{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                if stack:
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as output:
+            for stack, count in self.samples.most_common():
+                output.write(f"{stack} {count}\n")
+
+
+def active_sampler() -> ThreadSampler | None:
+    """The sampler profiling the current thread, to hand to worker threads it starts."""
+    return getattr(_ACTIVE, "sampler", None)
+
+
+@contextmanager
+def sample_thread(sampler: ThreadSampler | None) -> Iterator[None]:
+    """Include the current (worker) thread in ``sampler`` while the block runs."""
+    if sampler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    sampler.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        sampler.remove_thread(thread_id)
+
+
+@contextmanager
+def profile_current_thread(path: Path, interval_ms: int) -> Iterator[None]:
+    """Profile the current thread, and worker threads that join via ``sample_thread``."""
+    sampler = ThreadSampler(threading.get_ident(), interval_ms / 1000)
+    previous = active_sampler()
+    _ACTIVE.sampler = sampler
+    sampler.start()
+    try:
+        yield
+    finally:
+        _ACTIVE.sampler = previous
+        sampler.stop()
+        sampler.write(path)
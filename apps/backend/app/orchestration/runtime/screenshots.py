@@ -0,0 +1,132 @@
+import base64
+import io
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.core.config import Settings
+
+SCREENSHOT_MIME = {"jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+
+class PendingScreenshot:
+    """A captured screenshot whose downscaling and encoding run on the screenshot pool.
+
+    ``stats`` is created with every key up front and only its values are filled in
+    by the worker, so it can be serialized with step results at any time.
+    """
+
+    def __init__(self, future: Future, stats: dict) -> None:
+        self.future = future
+        self.stats = stats
+
+    def result(self) -> dict:
+        return self.future.result()
+
+
+def _save(image, fmt: str, quality: int) -> bytes:
+    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=quality)
+    return buffer.getvalue()
+
+
+def _encode(raw: bytes, captured_as: str, settings: Settings, stats: dict) -> dict:
+    from PIL import Image
+
+    started = time.perf_counter()
+    fmt = settings.screenshot_format
+    max_dimension = settings.screenshot_max_dimension
+    image = Image.open(io.BytesIO(raw))
+    oversized = max_dimension > 0 and max(image.size) > max_dimension
+    if captured_as == fmt and not oversized:
+        data = raw
+    else:
+        if oversized:
+            image.thumbnail((max_dimension, max_dimension))
+        data = _save(image, fmt, settings.screenshot_quality)
+
+    thumbnail = None
+    if settings.screenshot_thumbnail_size > 0:
+        small = image.copy()
+        small.thumbnail((settings.screenshot_thumbnail_size, settings.screenshot_thumbnail_size))
+        thumbnail = base64.b64encode(_save(small, fmt, settings.screenshot_quality))
+
+    width, height = image.size
+    stats.update(
+        {
+            "encode_ms": round((time.perf_counter() - started) * 1000, 1),
+            "bytes": len(data),
+            "width": width,
+            "height": height,
+        }
+    )
+    return {
+        "base64": base64.b64encode(data).decode("ascii"),
+        "mime": SCREENSHOT_MIME[fmt],
+        "thumbnail_base64": thumbnail.decode("ascii") if thumbnail else None,
+    }
+
+
+def capture_screenshot(page, settings: Settings) -> PendingScreenshot:
+    """Grab the page on the calling thread and hand encoding off to the pool.
+
+    JPEG is captured as JPEG directly (Chromium encodes it much faster than PNG);
+    other formats are captured losslessly and converted by Pillow.
+    """
+    captured_as = "jpeg" if settings.screenshot_format == "jpeg" else "png"
+    options: dict = {
+        "full_page": settings.screenshot_full_page,
+        "type": captured_as,
+        "scale": "css",
+    }
+    if captured_as == "jpeg":
+        options["quality"] = settings.screenshot_quality
+    started = time.perf_counter()
+    raw = page.screenshot(**options)
+    stats = {
+        "capture_ms": round((time.perf_counter() - started) * 1000, 1),
+        "full_page": settings.screenshot_full_page,
+        "mime": SCREENSHOT_MIME[settings.screenshot_format],
+        "encode_ms": None,
+        "bytes": None,
+        "width": None,
+        "height": None,
+    }
+    future = get_screenshot_pool(settings).submit(_encode, raw, captured_as, settings, stats)
+    return PendingScreenshot(future, stats)
+
+
+def screenshot_fields(pending: PendingScreenshot | None, prefix: str = "screenshot") -> dict:
+    """Wait for an encoded screenshot and return it as result payload fields."""
+    if pending is None:
+        return {}
+    try:
+        encoded = pending.result()
+    except Exception:  # noqa: BLE001
+        return {}
+    fields = {
+        f"{prefix}_base64": encoded["base64"],
+        f"{prefix}_mime": encoded["mime"],
+        f"{prefix}_stats": pending.stats,
+    }
+    if encoded["thumbnail_base64"]:
+        fields[f"{prefix}_thumbnail_base64"] = encoded["thumbnail_base64"]
+    return fields
+
+
+_POOL: ThreadPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_screenshot_pool(settings: Settings | None = None) -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            settings = settings or Settings()
+            _POOL = ThreadPoolExecutor(
+                max_workers=max(1, settings.screenshot_workers),
+                thread_name_prefix="screenshot",
+            )
+        return _POOL
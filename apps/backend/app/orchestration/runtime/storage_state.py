@@ -0,0 +1,39 @@
+from app.core.config import Settings
+from app.db.session import get_session
+from app.services.browser_storage_service import BrowserStorageService
+
+
+def storage_state_enabled(user_id: int | None, settings: Settings) -> bool:
+    return user_id is not None and bool(settings.browser_state_encryption_key)
+
+
+def load_storage_state(user_id: int | None, urls: list[str], settings: Settings) -> dict | None:
+    if not storage_state_enabled(user_id, settings):
+        return None
+    session = next(get_session())
+    try:
+        return BrowserStorageService(session, settings).load(user_id, urls)
+    except Exception:  # noqa: BLE001
+        return None
+    finally:
+        session.close()
+
+
+def save_storage_state(
+    user_id: int | None, states: list[tuple[dict, list[str]]], settings: Settings
+) -> None:
+    """Persist ``(storage_state, visited_urls)`` pairs collected from finished contexts.
+
+    Persistence is best effort: a failure here must not fail the task itself.
+    """
+    if not storage_state_enabled(user_id, settings) or not states:
+        return
+    session = next(get_session())
+    try:
+        service = BrowserStorageService(session, settings)
+        for state, urls in states:
+            service.save(user_id, state, urls)
+    except Exception:  # noqa: BLE001
+        session.rollback()
+    finally:
+        session.close()
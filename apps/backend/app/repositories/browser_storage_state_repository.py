@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.browser_storage_state import BrowserStorageState
+
+
+class BrowserStorageStateRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def list_active(
+        self, user_id: int, now: datetime, domains: list[str] | None = None
+    ) -> list[BrowserStorageState]:
+        stmt = select(BrowserStorageState).where(
+            BrowserStorageState.user_id == user_id,
+            BrowserStorageState.expires_at > now,
+        )
+        if domains is not None:
+            stmt = stmt.where(BrowserStorageState.domain.in_(domains))
+        return list(self.session.scalars(stmt.order_by(BrowserStorageState.domain)))
+
+    def upsert(
+        self, user_id: int, domain: str, encrypted_state: bytes, expires_at: datetime
+    ) -> BrowserStorageState:
+        stmt = select(BrowserStorageState).where(
+            BrowserStorageState.user_id == user_id,
+            BrowserStorageState.domain == domain,
+        )
+        record = self.session.scalars(stmt).first()
+        if record is None:
+            record = BrowserStorageState(user_id=user_id, domain=domain)
+            self.session.add(record)
+        record.encrypted_state = encrypted_state
+        record.expires_at = expires_at
+        return record
+
+    def delete(self, user_id: int, domain: str | None = None) -> int:
+        stmt = delete(BrowserStorageState).where(BrowserStorageState.user_id == user_id)
+        if domain is not None:
+            stmt = stmt.where(BrowserStorageState.domain == domain)
+        return self.session.execute(stmt).rowcount
+
+    def delete_expired(self, user_id: int, now: datetime) -> int:
+        stmt = delete(BrowserStorageState).where(
+            BrowserStorageState.user_id == user_id,
+            BrowserStorageState.expires_at <= now,
+        )
+        return self.session.execute(stmt).rowcount
@@ -0,0 +1,11 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class BrowserStateRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    domain: str
+    expires_at: datetime
+    updated_at: datetime
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.core.domains import check_public_url
+
+
+class MonitorCreate(BaseModel):
+    prompt: str
+    interval_minutes: int = Field(default=60, ge=1)
+    notify_url: str | None = None
+
+    @field_validator("notify_url")
+    @classmethod
+    def _public_notify_url(cls, value: str | None) -> str | None:
+        return check_public_url(value) if value else value
+
+
+class MonitorUpdate(BaseModel):
+    prompt: str | None = None
+    interval_minutes: int | None = Field(default=None, ge=1)
+    notify_url: str | None = None
+    enabled: bool | None = None
+
+    @field_validator("notify_url")
+    @classmethod
+    def _public_notify_url(cls, value: str | None) -> str | None:
+        return check_public_url(value) if value else value
+
+
+class MonitorRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    prompt: str
+    interval_minutes: int
+    enabled: bool
+    notify_url: str | None = None
+    run_count: int
+    change_count: int
+    last_error: str | None = None
+    last_run_at: datetime | None = None
+    last_changed_at: datetime | None = None
+    next_run_at: datetime
+    created_at: datetime
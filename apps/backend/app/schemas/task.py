@@ -6,6 +6,25 @@ from pydantic import BaseModel, ConfigDict
 
 class TaskCreate(BaseModel):
     prompt: str
+    debug: bool = False
+    # Skip deduplication against running or recently completed identical tasks.
+    fresh: bool = False
+
+
+class TaskSearchResult(BaseModel):
+    id: int
+    prompt: str
+    status: str
+    rank: float
+    headline: str
+    created_at: datetime
+
+
+class TaskSearchPage(BaseModel):
+    items: list[TaskSearchResult]
+    page: int
+    page_size: int
+    has_more: bool
 
 
 class TaskRead(BaseModel):
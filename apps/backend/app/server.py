@@ -0,0 +1,29 @@
+from flask import Flask
+
+from app.core.config import Settings
+from app.orchestration.runtime.admission import default_browser_limit
+
+
+def serve(app: Flask, settings: Settings) -> None:
+    """Run the HTTP server for the configured mode.
+
+    ``gevent`` serves each connection on a greenlet, so thousands of idle SSE streams
+    cost a few KB each instead of a WSGI thread; browser work is still done on native
+    threads (see ``app.core.concurrency.offload`` and the task runner).
+    """
+    if settings.server_mode != "gevent":
+        app.run(host=settings.server_host, port=settings.server_port, debug=True)
+        return
+
+    from gevent import get_hub
+    from gevent.pool import Pool
+    from gevent.pywsgi import WSGIServer
+
+    # Offloaded calls are running browsers plus /tasks/run requests waiting in the queue.
+    get_hub().threadpool.maxsize = default_browser_limit(settings) + settings.admission_queue_size
+    server = WSGIServer(
+        (settings.server_host, settings.server_port),
+        app,
+        spawn=Pool(settings.server_max_connections),
+    )
+    server.serve_forever()
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, timedelta
+
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.core.domains import domain_matches, domain_of
+from app.models.browser_storage_state import BrowserStorageState
+from app.repositories.browser_storage_state_repository import BrowserStorageStateRepository
+
+
+def _domains_for(urls: list[str]) -> list[str]:
+    return sorted({domain for domain in (domain_of(url) for url in urls) if domain})
+
+
+def _slice_state(state: dict, domain: str) -> dict:
+    """Keep only the cookies and origins of a storage_state that belong to ``domain``."""
+    return {
+        "cookies": [
+            cookie
+            for cookie in state.get("cookies", [])
+            if domain_matches(cookie.get("domain", ""), domain)
+        ],
+        "origins": [
+            origin
+            for origin in state.get("origins", [])
+            if domain_matches(domain_of(origin.get("origin", "")), domain)
+        ],
+    }
+
+
+class BrowserStorageService:
+    def __init__(self, session: Session, settings: Settings | None = None) -> None:
+        self.session = session
+        self.settings = settings or Settings()
+        self.repo = BrowserStorageStateRepository(session)
+        key = self.settings.browser_state_encryption_key
+        self.fernet = Fernet(key.encode("ascii")) if key else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.fernet is not None
+
+    def load(self, user_id: int, urls: list[str]) -> dict | None:
+        """Merge the stored, unexpired state of every domain in ``urls`` for a new context."""
+        domains = _domains_for(urls)
+        if not self.enabled or not domains:
+            return None
+        merged: dict = {"cookies": [], "origins": []}
+        for record in self.repo.list_active(user_id, datetime.utcnow(), domains):
+            try:
+                state = json.loads(self.fernet.decrypt(record.encrypted_state))
+            except (InvalidToken, ValueError):
+                continue
+            merged["cookies"].extend(state.get("cookies", []))
+            merged["origins"].extend(state.get("origins", []))
+        if not merged["cookies"] and not merged["origins"]:
+            return None
+        return merged
+
+    def save(self, user_id: int, state: dict, urls: list[str]) -> None:
+        """Store the slice of ``state`` for each visited domain and refresh its expiry."""
+        domains = _domains_for(urls)
+        if not self.enabled or not domains:
+            return
+        now = datetime.utcnow()
+        expires_at = now + timedelta(hours=self.settings.browser_state_ttl_hours)
+        self.repo.delete_expired(user_id, now)
+        for domain in domains:
+            sliced = _slice_state(state, domain)
+            if not sliced["cookies"] and not sliced["origins"]:
+                continue
+            token = self.fernet.encrypt(json.dumps(sliced).encode("utf-8"))
+            self.repo.upsert(user_id, domain, token, expires_at)
+        self.session.commit()
+
+    def list_states(self, user_id: int) -> list[BrowserStorageState]:
+        return self.repo.list_active(user_id, datetime.utcnow())
+
+    def purge(self, user_id: int, domain: str | None = None) -> int:
+        deleted = self.repo.delete(user_id, domain)
+        self.session.commit()
+        return deleted
@@ -0,0 +1,83 @@
+import difflib
+import hashlib
+import json
+from urllib.parse import urlsplit
+
+EXTRACT_ACTIONS = ("extract_text", "extract_structured")
+
+
+def _normalize(value) -> str:
+    return " ".join(str(value).split())
+
+
+def page_snapshot(result: dict) -> dict:
+    """The parts of a run that define "the page changed": url, title and extracted data.
+
+    Whitespace is collapsed so reflowed markup does not register as a change. Extractions
+    are keyed by selector rather than step position, so a replanned run with extra or
+    fewer steps still compares like with like, and the URL's query string and fragment
+    (often session ids or tracking parameters) are dropped.
+    """
+    extracted: dict[str, str | list[str]] = {}
+    for item in result.get("step_results", []):
+        if not item.get("ok") or item.get("action") not in EXTRACT_ACTIONS:
+            continue
+        base = item.get("selector") or item.get("description") or item["action"]
+        key, repeat = base, 1
+        while key in extracted:
+            repeat += 1
+            key = f"{base}#{repeat}"
+        if item["action"] == "extract_text":
+            extracted[key] = _normalize(item.get("text") or "")
+        else:
+            extracted[key] = [
+                json.dumps(
+                    {name: _normalize(value) for name, value in record.items()}, sort_keys=True
+                )
+                for record in item.get("records") or []
+            ]
+    return {
+        "url": urlsplit(result.get("url") or "")._replace(query="", fragment="").geturl(),
+        "title": _normalize(result.get("title", "")),
+        "extracted": extracted,
+    }
+
+
+def snapshot_hash(snapshot: dict) -> str:
+    return hashlib.sha256(json.dumps(snapshot, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def diff_snapshots(previous: dict, current: dict, max_lines: int) -> dict:
+    """Compact description of what changed between two snapshots."""
+    changes: dict = {}
+    for field in ("url", "title"):
+        if previous.get(field) != current.get(field):
+            changes[field] = {"from": previous.get(field), "to": current.get(field)}
+
+    before = previous.get("extracted", {})
+    after = current.get("extracted", {})
+    extracted: dict[str, dict] = {}
+    for key in sorted(before.keys() | after.keys()):
+        old, new = before.get(key), after.get(key)
+        if old == new:
+            continue
+        rows_before, rows_after = isinstance(old, list), isinstance(new, list)
+        if (rows_before or old is None) and (rows_after or new is None):
+            old_rows, new_rows = old or [], new or []
+            extracted[key] = {
+                "added": [json.loads(row) for row in new_rows if row not in old_rows][:max_lines],
+                "removed": [json.loads(row) for row in old_rows if row not in new_rows][
+                    :max_lines
+                ],
+            }
+        elif not rows_before and not rows_after:
+            # Extracted text is a single normalized line; diff it sentence by sentence.
+            lines = difflib.unified_diff(
+                (old or "").split(". "), (new or "").split(". "), lineterm="", n=0
+            )
+            extracted[key] = {"diff": list(lines)[2 : max_lines + 2]}
+        else:
+            extracted[key] = {"from": old, "to": new}
+    if extracted:
+        changes["extracted"] = extracted
+    return changes
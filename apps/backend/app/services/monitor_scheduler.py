@@ -0,0 +1,98 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import Settings
+from app.db.session import get_session
+from app.orchestration.runtime.admission import AdmissionRejected, get_admission_controller
+from app.services.monitor_service import MonitorService
+
+
+def run_monitor_with_admission(
+    monitor_id: int, user_id: int, settings: Settings, reschedule: bool = True
+) -> dict:
+    """Run one monitor check through the same browser admission queue as tasks.
+
+    When no browser slot is available the check is deferred and, for scheduled runs,
+    the monitor is moved to the suggested retry time.
+    """
+    admission = get_admission_controller()
+    session = next(get_session())
+    service = MonitorService(session, settings)
+    try:
+        try:
+            ticket = admission.submit(user_id)
+        except AdmissionRejected as exc:
+            if reschedule:
+                service.reschedule(monitor_id, exc.retry_after)
+            return {"status": "deferred", "retry_after": exc.retry_after}
+        try:
+            if not admission.wait(ticket, settings.admission_queue_timeout_s):
+                if reschedule:
+                    service.reschedule(monitor_id, 60)
+                return {"status": "deferred", "retry_after": 60}
+            return service.run_check(monitor_id)
+        finally:
+            admission.release(ticket)
+    finally:
+        session.close()
+
+
+class MonitorScheduler:
+    """Polls for due monitors on a native thread and runs a bounded number at a time."""
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="monitor-scheduler", daemon=True)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.monitor_max_concurrency), thread_name_prefix="monitor"
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def tick(self) -> int:
+        session = next(get_session())
+        try:
+            claimed = MonitorService(session, self.settings).claim_due(
+                self.settings.monitor_max_concurrency
+            )
+        finally:
+            session.close()
+        # Wait for this batch so at most monitor_max_concurrency checks run at once.
+        list(self._pool.map(lambda claim: self._check(*claim), claimed))
+        return len(claimed)
+
+    def _check(self, monitor_id: int, user_id: int) -> None:
+        try:
+            run_monitor_with_admission(monitor_id, user_id, self.settings)
+        except Exception:  # noqa: BLE001
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self.tick()
+            except Exception:  # noqa: BLE001
+                claimed = 0
+            # A full batch suggests more are due; check again right away.
+            if claimed < self.settings.monitor_max_concurrency:
+                self._stop.wait(self.settings.monitor_poll_interval_s)
+
+
+_SCHEDULER: MonitorScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def start_monitor_scheduler(settings: Settings) -> MonitorScheduler:
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = MonitorScheduler(settings)
+            _SCHEDULER.start()
+        return _SCHEDULER
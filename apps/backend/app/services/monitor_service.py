@@ -0,0 +1,230 @@
+from datetime import datetime, timedelta
+from ipaddress import ip_address
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.core.domains import resolve_public_url
+from app.models.monitor import Monitor
+from app.schemas.monitor import MonitorUpdate
+from app.services.change_detection import diff_snapshots, page_snapshot, snapshot_hash
+from app.services.task_service import TaskService
+
+
+class _PinnedHostAdapter(HTTPAdapter):
+    """Verifies TLS against the URL's hostname while connecting to a pinned address."""
+
+    def __init__(self, hostname: str) -> None:
+        self._hostname = hostname
+        super().__init__(max_retries=0)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        kwargs["server_hostname"] = self._hostname
+        kwargs["assert_hostname"] = self._hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _pinned_url(url: str, address: str) -> str:
+    parts = urlsplit(url)
+    host = f"[{address}]" if ip_address(address).version == 6 else address
+    userinfo = parts.netloc.rpartition("@")[0]
+    netloc = (f"{userinfo}@" if userinfo else "") + host
+    if parts.port:
+        netloc += f":{parts.port}"
+    return parts._replace(netloc=netloc).geturl()
+
+
+class MonitorService:
+    def __init__(self, session: Session, settings: Settings | None = None) -> None:
+        self.session = session
+        self.settings = settings or Settings()
+
+    def create_monitor(
+        self, user_id: int, prompt: str, interval_minutes: int, notify_url: str | None = None
+    ) -> Monitor:
+        monitor = Monitor(
+            user_id=user_id,
+            prompt=prompt,
+            interval_minutes=interval_minutes,
+            notify_url=notify_url,
+            enabled=True,
+            run_count=0,
+            change_count=0,
+            next_run_at=datetime.utcnow(),
+        )
+        self.session.add(monitor)
+        self.session.commit()
+        self.session.refresh(monitor)
+        return monitor
+
+    def list_monitors(self, user_id: int) -> list[Monitor]:
+        stmt = (
+            select(Monitor).where(Monitor.user_id == user_id).order_by(Monitor.created_at.desc())
+        )
+        return list(self.session.scalars(stmt))
+
+    def get_monitor(self, monitor_id: int, user_id: int) -> Monitor | None:
+        stmt = select(Monitor).where(Monitor.id == monitor_id, Monitor.user_id == user_id)
+        return self.session.scalars(stmt).first()
+
+    def update_monitor(self, monitor: Monitor, changes: MonitorUpdate) -> Monitor:
+        if changes.prompt is not None and changes.prompt != monitor.prompt:
+            # A new objective invalidates the cached plan and the change baseline.
+            monitor.prompt = changes.prompt
+            monitor.plan = None
+            monitor.snapshot = None
+            monitor.content_hash = None
+        if changes.interval_minutes is not None:
+            monitor.interval_minutes = changes.interval_minutes
+        if "notify_url" in changes.model_fields_set:
+            monitor.notify_url = changes.notify_url
+        if changes.enabled is not None:
+            if changes.enabled and not monitor.enabled:
+                monitor.next_run_at = datetime.utcnow()
+            monitor.enabled = changes.enabled
+        self.session.commit()
+        self.session.refresh(monitor)
+        return monitor
+
+    def delete_monitor(self, monitor: Monitor) -> None:
+        self.session.delete(monitor)
+        self.session.commit()
+
+    def claim_due(self, limit: int) -> list[tuple[int, int]]:
+        """Reserve due monitors by pushing their next run out; returns (id, user_id) pairs.
+
+        ``SKIP LOCKED`` lets several scheduler processes claim concurrently without
+        running the same monitor twice.
+        """
+        now = datetime.utcnow()
+        stmt = (
+            select(Monitor)
+            .where(Monitor.enabled.is_(True), Monitor.next_run_at <= now)
+            .order_by(Monitor.next_run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        monitors = list(self.session.scalars(stmt))
+        for monitor in monitors:
+            monitor.next_run_at = now + timedelta(minutes=monitor.interval_minutes)
+        claimed = [(monitor.id, monitor.user_id) for monitor in monitors]
+        self.session.commit()
+        return claimed
+
+    def reschedule(self, monitor_id: int, delay_s: int) -> None:
+        monitor = self.session.get(Monitor, monitor_id)
+        if monitor is None:
+            return
+        monitor.next_run_at = datetime.utcnow() + timedelta(seconds=delay_s)
+        self.session.commit()
+
+    def run_check(self, monitor_id: int) -> dict:
+        """Run one check and persist only what changed.
+
+        Unchanged pages update the monitor's counters and nothing else: no
+        summarization, no task row. The first check stores a baseline task; later
+        changes store a task with the compact diff and notify ``notify_url``.
+        """
+        # Imported on first use so API-only processes never load the browser stack.
+        from app.llm.gemini_client import BrowserPlan, GeminiClient
+        from app.orchestration.browser_graph import run_monitor_check
+
+        monitor = self.session.get(Monitor, monitor_id)
+        if monitor is None:
+            raise ValueError("Monitor not found")
+        prompt, user_id = monitor.prompt, monitor.user_id
+        cached_plan = BrowserPlan.model_validate(monitor.plan) if monitor.plan else None
+        # Release the connection while the browser runs.
+        self.session.commit()
+
+        try:
+            plan, result = run_monitor_check(prompt, cached_plan, user_id)
+            error = str(result.get("error") or "")
+        except Exception as exc:  # noqa: BLE001
+            plan, result, error = None, {}, str(exc)
+
+        monitor = self.session.get(Monitor, monitor_id)
+        if monitor is None:
+            raise ValueError("Monitor not found")
+        monitor.run_count += 1
+        monitor.last_run_at = datetime.utcnow()
+        if error:
+            monitor.last_error = error[:1024]
+            # Plan from scratch next time rather than retrying a plan that broke.
+            monitor.plan = None
+            self.session.commit()
+            return {"status": "failed", "error": error}
+
+        monitor.last_error = None
+        monitor.plan = plan.model_dump()
+        snapshot = page_snapshot(result)
+        content_hash = snapshot_hash(snapshot)
+        if content_hash == monitor.content_hash:
+            self.session.commit()
+            return {"status": "unchanged"}
+
+        previous = monitor.snapshot
+        task_result: dict = {
+            "monitor_id": monitor.id,
+            "url": snapshot["url"],
+            "title": snapshot["title"],
+            "content_hash": content_hash,
+        }
+        if previous is None:
+            status = "baseline"
+            changes: dict = {}
+            task_result["baseline"] = snapshot
+        else:
+            status = "changed"
+            changes = diff_snapshots(previous, snapshot, self.settings.monitor_diff_max_lines)
+            task_result["changes"] = changes
+            feedback = GeminiClient().summarize_execution(prompt, task_result)
+            if feedback:
+                task_result["feedback"] = feedback
+            monitor.change_count += 1
+            monitor.last_changed_at = monitor.last_run_at
+        monitor.snapshot = snapshot
+        monitor.content_hash = content_hash
+        notify_url = monitor.notify_url
+
+        tasks = TaskService(self.session)
+        task = tasks.complete_task(tasks.create_task(user_id, prompt).id, task_result)
+        outcome = {"status": status, "task_id": task.id, "changes": changes}
+        if status == "changed" and notify_url:
+            outcome["notified"] = self._notify(
+                notify_url, {"monitor_id": monitor_id, "task_id": task.id, **task_result}
+            )
+        return outcome
+
+    def _notify(self, url: str, payload: dict) -> bool:
+        """POST ``payload`` to ``url`` on the address its host was checked to resolve to.
+
+        The host is re-checked at send time and the connection pinned to that address,
+        so a DNS answer that changes between check and connect cannot redirect the
+        request to an internal address. Redirects are not followed for the same reason.
+        """
+        try:
+            address = resolve_public_url(url)
+        except ValueError:
+            return False
+        hostname = urlsplit(url).hostname or ""
+        netloc = urlsplit(url).netloc.rpartition("@")[2]
+        with requests.Session() as session:
+            # An environment proxy would resolve the host itself, undoing the pinning.
+            session.trust_env = False
+            session.mount("https://", _PinnedHostAdapter(hostname))
+            try:
+                response = session.post(
+                    _pinned_url(url, address),
+                    json=payload,
+                    headers={"Host": netloc},
+                    timeout=self.settings.monitor_notify_timeout_s,
+                    allow_redirects=False,
+                )
+                return response.ok and not response.is_redirect
+            except requests.RequestException:
+                return False
@@ -0,0 +1,62 @@
+import hashlib
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from app.core.concurrency import new_lock
+from app.models.task import Task
+from app.orchestration.runtime.event_bus import get_event_bus
+from app.orchestration.runtime.session_store import ACTIVE_SESSIONS
+from app.services.task_service import TaskService
+
+_LOCKS: dict[tuple[int, str], list] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split())
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    return hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def single_flight(user_id: int, fingerprint: str) -> Iterator[None]:
+    """Serialize the check-then-create of tasks for one user and prompt.
+
+    The section runs database queries, which yield to the gevent hub, so under gevent
+    the per-key lock is a gevent lock; waiting on a native one would block the hub. The
+    registry guard is only held for dictionary updates and never across a yield.
+    """
+    key = (user_id, fingerprint)
+    with _LOCKS_GUARD:
+        entry = _LOCKS.get(key)
+        if entry is None:
+            entry = _LOCKS[key] = [new_lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _LOCKS_GUARD:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _LOCKS[key]
+
+
+def task_is_live(task_id: int) -> bool:
+    """A running row only counts if this process is still executing or queueing it."""
+    return task_id in ACTIVE_SESSIONS or get_event_bus().is_open(task_id)
+
+
+def find_duplicate_task(
+    service: TaskService, user_id: int, fingerprint: str, window_s: int
+) -> Task | None:
+    """The newest live task for this prompt, or one that completed within the window."""
+    completed_since = datetime.utcnow() - timedelta(seconds=window_s) if window_s > 0 else None
+    for task in service.find_by_prompt_hash(user_id, fingerprint, completed_since):
+        if task.status == "completed" or task_is_live(task.id):
+            return task
+    return None
@@ -0,0 +1,75 @@
+import threading
+from pathlib import Path
+
+from app.core.config import Settings
+from app.db.session import get_session
+from app.orchestration.runtime.admission import AdmissionTicket, get_admission_controller
+from app.orchestration.runtime.event_bus import Subscription, get_event_bus
+from app.services.task_service import TaskService
+
+QUEUE_TIMEOUT_ERROR = "Timed out waiting for a free browser slot"
+
+
+def _run_stream_task(
+    task_id: int,
+    user_id: int,
+    prompt: str,
+    ticket: AdmissionTicket,
+    artifact_dir: Path | None = None,
+) -> None:
+    from app.orchestration.browser_graph import run_browser_graph_stream
+
+    settings = Settings()
+    bus = get_event_bus()
+    admission = get_admission_controller()
+    session = next(get_session())
+    service = TaskService(session)
+    try:
+        for position in admission.wait_with_updates(ticket, settings.admission_queue_timeout_s):
+            bus.publish(task_id, {"event": "queued", "data": {"position": position}})
+        if not ticket.admitted:
+            service.fail_task(task_id, QUEUE_TIMEOUT_ERROR)
+            bus.publish(task_id, {"event": "error", "data": {"error": QUEUE_TIMEOUT_ERROR}})
+            return
+        for event in run_browser_graph_stream(
+            prompt, task_id, user_id=user_id, artifact_dir=artifact_dir
+        ):
+            if event["event"] == "complete":
+                service.complete_task(task_id, event["data"])
+            if event["event"] == "error":
+                service.fail_task(task_id, event["data"].get("error", "Unknown error"))
+            bus.publish(task_id, event)
+    except Exception as exc:  # noqa: BLE001
+        session.rollback()
+        service.fail_task(task_id, str(exc))
+        bus.publish(task_id, {"event": "error", "data": {"error": str(exc)}})
+    finally:
+        admission.release(ticket)
+        session.close()
+        bus.close(task_id)
+
+
+def start_stream_task(
+    task_id: int,
+    user_id: int,
+    prompt: str,
+    ticket: AdmissionTicket,
+    artifact_dir: Path | None = None,
+) -> Subscription:
+    """Run a streamed task on its own native thread and subscribe the caller to it.
+
+    The automation no longer lives inside the HTTP request, so any number of streams
+    can follow it and a dropped connection does not abort the run.
+    """
+    bus = get_event_bus()
+    bus.open(task_id)
+    bus.publish(task_id, {"event": "task", "data": {"task_id": task_id}})
+    subscription = bus.subscribe(task_id)
+    thread = threading.Thread(
+        target=_run_stream_task,
+        args=(task_id, user_id, prompt, ticket, artifact_dir),
+        name=f"task-{task_id}",
+        daemon=True,
+    )
+    thread.start()
+    return subscription
@@ -1,14 +1,56 @@
+from datetime import datetime
+
+from sqlalchemy import and_, cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import Session
 
 from app.models.task import Task
 
+SEARCH_TEXT_CONFIG = "english"
+# Keeps the tsvector well under Postgres' 1MB limit for tasks that scrape a lot of text.
+SEARCH_EXTRACTED_MAX_CHARS = 100_000
+
+
+def _weighted_vector(text: str, weight: str):
+    config = cast(literal(SEARCH_TEXT_CONFIG), REGCONFIG)
+    return func.setweight(func.to_tsvector(config, text or ""), weight)
+
+
+def _extracted_text(result: dict) -> str:
+    parts: list[str] = []
+    for item in [*result.get("step_results", []), *result.get("extracted", [])]:
+        if not item.get("ok"):
+            continue
+        if item.get("text"):
+            parts.append(str(item["text"]))
+        for record in item.get("records") or []:
+            parts.extend(str(value) for value in record.values() if value)
+    return "\n".join(parts)[:SEARCH_EXTRACTED_MAX_CHARS]
+
+
+def _search_document(prompt: str, result: dict | None = None):
+    vector = _weighted_vector(prompt, "A")
+    if result:
+        vector = (
+            vector.op("||")(_weighted_vector(result.get("goal", ""), "B"))
+            .op("||")(_weighted_vector(result.get("feedback", ""), "C"))
+            .op("||")(_weighted_vector(_extracted_text(result), "D"))
+        )
+    return vector
+
 
 class TaskService:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def create_task(self, user_id: int, prompt: str) -> Task:
-        task = Task(user_id=user_id, prompt=prompt, status="running")
+    def create_task(self, user_id: int, prompt: str, prompt_hash: str | None = None) -> Task:
+        task = Task(
+            user_id=user_id,
+            prompt=prompt,
+            prompt_hash=prompt_hash,
+            status="running",
+            search_vector=_search_document(prompt),
+        )
         self.session.add(task)
         self.session.commit()
         self.session.refresh(task)
@@ -21,6 +63,7 @@ class TaskService:
         task.status = "completed"
         task.result = result
         task.error = None
+        task.search_vector = _search_document(task.prompt, result)
         self.session.commit()
         self.session.refresh(task)
         return task
@@ -49,3 +92,40 @@ class TaskService:
             .filter(Task.id == task_id, Task.user_id == user_id)
             .first()
         )
+
+    def find_by_prompt_hash(
+        self, user_id: int, prompt_hash: str, completed_since: datetime | None, limit: int = 5
+    ) -> list[Task]:
+        """Newest running tasks for the prompt, plus completed ones since ``completed_since``."""
+        candidates = [Task.status == "running"]
+        if completed_since is not None:
+            candidates.append(
+                and_(Task.status == "completed", Task.updated_at >= completed_since)
+            )
+        stmt = (
+            select(Task)
+            .where(Task.user_id == user_id, Task.prompt_hash == prompt_hash, or_(*candidates))
+            .order_by(Task.created_at.desc())
+            .limit(limit)
+        )
+        return list(self.session.scalars(stmt))
+
+    def search_tasks(
+        self, user_id: int, query: str, limit: int, offset: int
+    ) -> list[tuple[Task, float, str]]:
+        """Rank the user's tasks against a web-style query (quotes, OR, -negation)."""
+        config = cast(literal(SEARCH_TEXT_CONFIG), REGCONFIG)
+        tsquery = func.websearch_to_tsquery(config, query)
+        rank = func.ts_rank_cd(Task.search_vector, tsquery)
+        stmt = (
+            select(
+                Task,
+                rank.label("rank"),
+                func.ts_headline(config, Task.prompt, tsquery).label("headline"),
+            )
+            .where(Task.user_id == user_id, Task.search_vector.op("@@")(tsquery))
+            .order_by(rank.desc(), Task.created_at.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [(row.Task, row.rank, row.headline) for row in self.session.execute(stmt)]
@@ -0,0 +1,104 @@
+"""Database round trips per authenticated request.
+
+Boots the real app against ``DATABASE_URL`` (migrated with ``alembic upgrade head``),
+signs Clerk-style tokens with a throwaway RSA key and calls read endpoints through the
+Flask test client. Counts SQL statements and pool checkouts per request, separately
+for the first (cold identity cache) and the following requests.
+
+    uv run python -m benchmarks.db_roundtrips --requests 200
+    uv run python -m benchmarks.db_roundtrips --no-identity-cache
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from sqlalchemy import event
+
+ENDPOINTS = ("/tasks", "/browser-state", "/tasks/search?q=price")
+
+
+def _keypair() -> tuple[str, str]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--no-identity-cache", action="store_true")
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("DATABASE_URL must point at a migrated database", file=sys.stderr)
+        return 1
+    private_pem, public_pem = _keypair()
+    os.environ["CLERK_JWT_PUBLIC_KEY"] = public_pem
+    os.environ["CLERK_JWKS_URL"] = ""
+    if args.no_identity_cache:
+        os.environ["AUTH_IDENTITY_CACHE_TTL_S"] = "0"
+
+    from app import create_app
+    from app.db.session import get_engine
+
+    app = create_app()
+    engine = get_engine()
+    counters = {"statements": 0, "checkouts": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_statement(*_args) -> None:
+        counters["statements"] += 1
+
+    @event.listens_for(engine.pool, "checkout")
+    def _count_checkout(*_args) -> None:
+        counters["checkouts"] += 1
+
+    subject = f"bench_{uuid.uuid4().hex[:12]}"
+    token = jwt.encode(
+        {"sub": subject, "email": f"{subject}@example.com", "exp": int(time.time()) + 3600},
+        private_pem,
+        algorithm="RS256",
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+
+    samples: list[tuple[int, int, float]] = []
+    for index in range(args.requests):
+        counters["statements"] = counters["checkouts"] = 0
+        started = time.perf_counter()
+        response = client.get(ENDPOINTS[index % len(ENDPOINTS)], headers=headers)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            print(f"request failed: {response.status_code} {response.get_data(as_text=True)}")
+            return 1
+        samples.append((counters["statements"], counters["checkouts"], elapsed_ms))
+
+    cold, warm = samples[0], samples[1:] or samples
+    print(f"requests:            {args.requests} over {', '.join(ENDPOINTS)}")
+    print(f"identity cache:      {'off' if args.no_identity_cache else 'on'}")
+    print(f"first request:       {cold[0]} statements, {cold[1]} checkouts, {cold[2]:.1f}ms")
+    print(
+        "warm (mean):         "
+        f"{statistics.mean(s[0] for s in warm):.2f} statements, "
+        f"{statistics.mean(s[1] for s in warm):.2f} checkouts, "
+        f"{statistics.mean(s[2] for s in warm):.1f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Load test for the gevent SSE serving path.
+
+Boots the real event bus and SSE response helper behind gevent's WSGI server, opens
+thousands of concurrent streams against it and publishes task events from a native
+thread (as the task runner does). Reports connect time, delivery latency and memory
+per open stream.
+
+With ``--db`` the streams go through the real app instead, against ``DATABASE_URL``
+(migrated with ``alembic upgrade head``): every client authenticates with a signed
+token and the events endpoint loads its task row before subscribing, so the auth,
+session and connection pool path runs under the same load.
+
+    uv run python -m benchmarks.sse_load --streams 5000 --tasks 50 --events 20
+    uv run python -m benchmarks.sse_load --streams 2000 --db
+"""
+
+from gevent import monkey
+from psycogreen.gevent import patch_psycopg
+
+monkey.patch_all(thread=False, select=False, subprocess=False)
+patch_psycopg()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+import resource  # noqa: E402
+import socket  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+import uuid  # noqa: E402
+
+import gevent  # noqa: E402
+import jwt  # noqa: E402
+from flask import Flask  # noqa: E402
+from gevent.pool import Pool  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+from app.api.sse import subscription_response  # noqa: E402
+from app.orchestration.runtime.event_bus import get_event_bus  # noqa: E402
+from benchmarks.db_roundtrips import _keypair  # noqa: E402
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _raise_fd_limit(needed: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def _build_app() -> Flask:
+    app = Flask(__name__)
+
+    @app.get("/tasks/<int:task_id>/events")
+    def events(task_id: int):
+        subscription = get_event_bus().subscribe(task_id)
+        if subscription is None:
+            return {"error": "Task not running"}, 404
+        return subscription_response(subscription, heartbeat_s=15.0)
+
+    return app
+
+
+def _build_db_app(tasks: int) -> tuple[Flask, list[int], str]:
+    """The real app on DATABASE_URL, a bench user's running tasks and its auth header."""
+    private_pem, public_pem = _keypair()
+    os.environ["CLERK_JWT_PUBLIC_KEY"] = public_pem
+    os.environ["CLERK_JWKS_URL"] = ""
+    # Selects the gevent-aware connection pool, as main.py does in this mode.
+    os.environ["SERVER_MODE"] = "gevent"
+
+    from app import create_app
+    from app.db.session import get_session
+    from app.repositories.user_repository import UserRepository
+    from app.services.task_service import TaskService
+
+    app = create_app()
+    subject = f"bench_{uuid.uuid4().hex[:12]}"
+    token = jwt.encode(
+        {"sub": subject, "email": f"{subject}@example.com", "exp": int(time.time()) + 3600},
+        private_pem,
+        algorithm="RS256",
+    )
+    authorization = f"Bearer {token}"
+    # The first authenticated request creates the user row.
+    app.test_client().get("/tasks", headers={"Authorization": authorization})
+    session = next(get_session())
+    try:
+        user = UserRepository(session).get_by_clerk_id(subject)
+        service = TaskService(session)
+        task_ids = [service.create_task(user.id, f"sse load {index}").id for index in range(tasks)]
+    finally:
+        session.close()
+    return app, task_ids, authorization
+
+
+def _client(
+    port: int, task_id: int, expected: int, latencies: list[float], authorization: str = ""
+) -> None:
+    sock = socket.create_connection(("127.0.0.1", port))
+    auth_line = f"Authorization: {authorization}\r\n" if authorization else ""
+    # HTTP/1.0 keeps the body unchunked so frames can be split on blank lines.
+    sock.sendall(f"GET /tasks/{task_id}/events HTTP/1.0\r\nHost: bench\r\n{auth_line}\r\n".encode())
+    buffer = b""
+    received = 0
+    try:
+        while received < expected:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            buffer += chunk
+            while b"\n\n" in buffer:
+                frame, buffer = buffer.split(b"\n\n", 1)
+                marker = frame.find(b'"sent_at": ')
+                if marker == -1:
+                    continue
+                sent_at = float(frame[marker + 11 :].split(b"}", 1)[0].split(b",", 1)[0])
+                latencies.append(time.perf_counter() - sent_at)
+                received += 1
+    finally:
+        sock.close()
+
+
+def _publish(task_ids: list[int], events: int, interval: float) -> None:
+    bus = get_event_bus()
+    for index in range(events):
+        for task_id in task_ids:
+            bus.publish(
+                task_id,
+                {"event": "step_result", "data": {"index": index, "sent_at": time.perf_counter()}},
+            )
+        time.sleep(interval)
+    for task_id in task_ids:
+        bus.close(task_id)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.25)
+    parser.add_argument("--db", action="store_true", help="serve through the real app")
+    args = parser.parse_args()
+
+    _raise_fd_limit(args.streams * 2 + 256)
+    if args.db:
+        if not os.environ.get("DATABASE_URL"):
+            print("--db needs DATABASE_URL pointing at a migrated database", file=sys.stderr)
+            return 1
+        app, task_ids, authorization = _build_db_app(args.tasks)
+    else:
+        app, task_ids, authorization = _build_app(), list(range(1, args.tasks + 1)), ""
+    bus = get_event_bus()
+    for task_id in task_ids:
+        bus.open(task_id)
+
+    server = WSGIServer(("127.0.0.1", 0), app, spawn=Pool(args.streams + 16), log=None)
+    server.start()
+    baseline_mb = _rss_mb()
+
+    latencies: list[float] = []
+    started = time.perf_counter()
+    clients = [
+        gevent.spawn(
+            _client,
+            server.server_port,
+            task_ids[i % len(task_ids)],
+            args.events,
+            latencies,
+            authorization,
+        )
+        for i in range(args.streams)
+    ]
+    while bus.stats()["subscribers"] < args.streams and time.perf_counter() - started < 60:
+        gevent.sleep(0.05)
+    connect_s = time.perf_counter() - started
+    stats = bus.stats()
+    connected_mb = _rss_mb()
+
+    publisher = threading.Thread(target=_publish, args=(task_ids, args.events, args.interval))
+    publisher.start()
+    gevent.joinall(clients, timeout=args.events * args.interval + 60)
+    publisher.join()
+    server.stop()
+
+    latencies.sort()
+    expected = args.streams * args.events
+    per_stream_kb = (connected_mb - baseline_mb) * 1024 / max(1, stats["subscribers"])
+    print(f"streams open:        {stats['subscribers']}/{args.streams} in {connect_s:.2f}s")
+    print(f"events delivered:    {len(latencies)}/{expected}")
+    if latencies:
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"delivery latency:    p50 {p50:.1f}ms  p99 {p99:.1f}ms")
+    print(f"rss:                 {baseline_mb:.1f}MB idle -> {connected_mb:.1f}MB with streams")
+    print(f"memory per stream:   {per_stream_kb:.1f}KB (server and client share the process)")
+    if args.db:
+        from app.db.session import get_engine
+
+        print(f"db pool:             {get_engine().pool.status()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
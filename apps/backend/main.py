@@ -1,6 +1,24 @@
-from app import create_app
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+if os.getenv("SERVER_MODE", "dev").lower() == "gevent":
+    from gevent import monkey
+    from psycogreen.gevent import patch_psycopg
+
+    # Playwright drives its own asyncio loop on native threads, so threads, select
+    # and subprocess stay unpatched; only sockets and sleeps become cooperative.
+    monkey.patch_all(thread=False, select=False, subprocess=False)
+    # psycopg2 does its own socket I/O in C; make its queries yield to the hub too.
+    patch_psycopg()
+
+from app import create_app  # noqa: E402
+from app.core.config import Settings  # noqa: E402
+from app.server import serve  # noqa: E402
 
 app = create_app()
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8005, debug=True)
+    serve(app, Settings())
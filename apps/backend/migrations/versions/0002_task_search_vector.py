@@ -0,0 +1,55 @@
+"""task full-text search vector
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    # btree_gin lets one GIN index cover user_id and the vector together, so a common
+    # term only matches the searching user's rows instead of every user's.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.add_column("tasks", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+    max_id = op.get_bind().execute(sa.text("SELECT max(id) FROM tasks")).scalar() or 0
+    with op.get_context().autocommit_block():
+        # Extracted step text only lives in the JSON result, so existing rows are indexed
+        # by prompt, goal and feedback; new completions index the extracted text as well.
+        # Each id range commits on its own so a large table is never locked as a whole.
+        for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+            op.execute(
+                sa.text(
+                    """
+                    UPDATE tasks SET search_vector =
+                        setweight(to_tsvector('english', coalesce(prompt, '')), 'A')
+                        || setweight(to_tsvector('english', coalesce(result->>'goal', '')), 'B')
+                        || setweight(
+                            to_tsvector('english', coalesce(result->>'feedback', '')), 'C'
+                        )
+                    WHERE id > :start AND id <= :end AND search_vector IS NULL
+                    """
+                ).bindparams(start=start, end=start + BACKFILL_BATCH_SIZE)
+            )
+        op.create_index(
+            "ix_tasks_user_search_vector",
+            "tasks",
+            ["user_id", "search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    # btree_gin is left installed; other objects may depend on it.
+    op.drop_index("ix_tasks_user_search_vector", table_name="tasks")
+    op.drop_column("tasks", "search_vector")
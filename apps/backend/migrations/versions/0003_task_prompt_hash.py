@@ -0,0 +1,31 @@
+"""task prompt hash for request deduplication
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Not backfilled: deduplication only looks at running tasks and recent completions,
+    # so rows created before this revision simply never match.
+    op.add_column("tasks", sa.Column("prompt_hash", sa.String(length=64), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_user_prompt_hash",
+            "tasks",
+            ["user_id", "prompt_hash", "created_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_user_prompt_hash", table_name="tasks")
+    op.drop_column("tasks", "prompt_hash")
@@ -0,0 +1,43 @@
+"""recurring monitors
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "monitors",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("prompt", sa.String(length=2048), nullable=False),
+        sa.Column("interval_minutes", sa.Integer(), nullable=False),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.Column("notify_url", sa.String(length=1024), nullable=True),
+        sa.Column("plan", sa.JSON(), nullable=True),
+        sa.Column("snapshot", sa.JSON(), nullable=True),
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+        sa.Column("run_count", sa.Integer(), nullable=False),
+        sa.Column("change_count", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.String(length=1024), nullable=True),
+        sa.Column("last_run_at", sa.DateTime(), nullable=True),
+        sa.Column("last_changed_at", sa.DateTime(), nullable=True),
+        sa.Column("next_run_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_monitors_id", "monitors", ["id"])
+    op.create_index("ix_monitors_user_id", "monitors", ["user_id"])
+    op.create_index("ix_monitors_enabled_next_run_at", "monitors", ["enabled", "next_run_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("monitors")
@@ -0,0 +1,39 @@
+"""browser storage states
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases built with create_all after storage states were added already have it.
+    if sa.inspect(op.get_bind()).has_table("browser_storage_states"):
+        return
+    op.create_table(
+        "browser_storage_states",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("domain", sa.String(length=255), nullable=False),
+        sa.Column("encrypted_state", sa.LargeBinary(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("user_id", "domain", name="uq_storage_state_user_domain"),
+    )
+    op.create_index("ix_browser_storage_states_id", "browser_storage_states", ["id"])
+    op.create_index("ix_browser_storage_states_user_id", "browser_storage_states", ["user_id"])
+    op.create_index(
+        "ix_browser_storage_states_expires_at", "browser_storage_states", ["expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("browser_storage_states")
@@ -110,7 +110,13 @@ const Dashboard = () => {
     if (!err) {
       return null;
     }
-    return String(err.data.failure_screenshot_base64 || "");
+    if (!err.data.failure_screenshot_base64) {
+      return null;
+    }
+    return {
+      data: String(err.data.failure_screenshot_base64),
+      mime: String(err.data.failure_screenshot_mime || "image/png"),
+    };
   }, [activeEvents]);
 
   const loadTasks = async () => {
@@ -314,7 +320,7 @@ const Dashboard = () => {
                   <img
                     className="rounded-xl border border-white/10"
                     alt="Failure screenshot"
-                    src={`data:image/png;base64,${failureShot}`}
+                    src={`data:${failureShot.mime};base64,${failureShot.data}`}
                   />
                 </div>
               )}
@@ -322,7 +328,9 @@ const Dashboard = () => {
                 <img
                   className="rounded-2xl border border-white/10"
                   alt="Final screenshot"
-                  src={`data:image/png;base64,${String(latestResult.screenshot_base64 || "")}`}
+                  src={`data:${String(latestResult.screenshot_mime || "image/png")};base64,${String(
+                    latestResult.screenshot_base64 || ""
+                  )}`}
                 />
               )}
             </div>